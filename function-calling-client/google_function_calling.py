@@ -3,12 +3,15 @@ import requests
 import google.generativeai as genai
 import logging
 import time
-import re
+import sys
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from dotenv import load_dotenv
 import os
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from injection_scanner import InjectionScanner
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -72,21 +75,12 @@ class TodoAPIClient:
         except Exception as e:
             return {"error": str(e)}
 
-    def search_todos(self, search_term: str) -> Dict[str, Any]:
+    def search_todos(self, search_term: str, page: int = 1, size: int = 10) -> Dict[str, Any]:
         try:
-            todos_response = self.get_todos()
-            if "error" in todos_response or todos_response["status"] != 200:
-                return todos_response
-            
-            todos_data = todos_response.get("data", [])
-            if isinstance(todos_data, dict):
-                todos_list = todos_data.get("items", [])
-            else:
-                todos_list = todos_data
-                
-            matching_todos = [todo for todo in todos_list
-                            if search_term.lower() in todo.get("title", "").lower()]
-            return {"status": 200, "data": matching_todos}
+            # Ranked server-side search over every todo, not just the first page.
+            params = {"q": search_term, "page": page, "size": size}
+            response = self.session.get(f"{self.base_url}/todos/search", params=params)
+            return {"status": response.status_code, "data": response.json() if response.status_code < 400 else response.text}
         except Exception as e:
             return {"error": str(e)}
 
@@ -98,11 +92,17 @@ class GuardrailManager:
         self.current_cost = 0.0
         self.session_start = time.time()
         
-        self.injection_patterns = [
-            r'ignore\s+previous\s+instructions', r'forget\s+everything\s+above',
-            r'system\s*:\s*you\s+are\s+now', r'<\s*script\s*>', r'javascript\s*:',
-            r'eval\s*\(', r'exec\s*\(', r'__import__\s*\('
-        ]
+        self.injection_patterns = {
+            "ignore_instructions": r'ignore\s+previous\s+instructions',
+            "forget_context": r'forget\s+everything\s+above',
+            "role_override": r'system\s*:\s*you\s+are\s+now',
+            "script_tag": r'<\s*script\s*>',
+            "javascript_url": r'javascript\s*:',
+            "eval_call": r'eval\s*\(',
+            "exec_call": r'exec\s*\(',
+            "dynamic_import": r'__import__\s*\('
+        }
+        self.scanner = InjectionScanner(self.injection_patterns)
         
     def check_request_limit(self):
         if self.current_requests >= self.max_requests:
@@ -112,9 +112,9 @@ class GuardrailManager:
         self.current_requests += 1
         
     def check_injection(self, text: str):
-        for pattern in self.injection_patterns:
-            if re.search(pattern, text.lower(), re.IGNORECASE):
-                raise PotentialInjectionError(f"Potential injection detected: {pattern}")
+        finding = self.scanner.scan_text(text)
+        if finding:
+            raise PotentialInjectionError(f"Potential injection detected: {finding.rule} ({finding.excerpt!r})")
     
     def get_usage_stats(self) -> Dict[str, Any]:
         return {
@@ -0,0 +1,88 @@
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+DEFAULT_MAX_LENGTH = 100_000
+
+# Reported instead of a pattern rule when a payload is too long to scan.
+TOO_LONG = "input_too_long"
+
+_REGEX_SYNTAX = set("\\.^$*+?{}[]|()")
+
+
+def _first_chars(patterns: List[str]) -> Optional[str]:
+    """Characters every match must start with, when each pattern starts
+    with a plain literal; None when any pattern could start otherwise."""
+    chars = set()
+    for pattern in patterns:
+        if (
+            not pattern
+            or pattern[0] in _REGEX_SYNTAX
+            or (len(pattern) > 1 and pattern[1] in "*?{")
+            or "|" in pattern
+        ):
+            return None
+        chars.add(pattern[0].lower())
+    return "".join(sorted(chars))
+
+
+class Finding(NamedTuple):
+    rule: str
+    path: str
+    excerpt: str
+
+
+class InjectionScanner:
+    """Scans text, or nested arguments, for any of a set of named patterns.
+
+    All rules are compiled once into a single case-insensitive alternation
+    with one named group per rule, so a string is read in one pass however
+    many rules there are, and the group that matched names the rule. When
+    every rule starts with a literal, a lookahead on those first characters
+    lets the engine skip positions where no rule can begin.
+    Strings inside dicts and lists (keys included) are scanned too. Input
+    longer than ``max_length`` characters in total is reported rather than
+    scanned, so a padded payload cannot push anything past the limit.
+    """
+
+    def __init__(self, rules: Dict[str, str], max_length: int = DEFAULT_MAX_LENGTH):
+        self.rules = dict(rules)
+        self.max_length = max_length
+        self._group_rules = {f"r{i}": name for i, name in enumerate(self.rules)}
+        alternation = "|".join(f"(?P<r{i}>{pattern})" for i, pattern in enumerate(self.rules.values()))
+        first = _first_chars(list(self.rules.values()))
+        if first:
+            alternation = f"(?=[{re.escape(first)}])(?:{alternation})"
+        self._pattern = re.compile(alternation, re.IGNORECASE)
+
+    def scan_text(self, text: str, path: str = "") -> Optional[Finding]:
+        if len(text) > self.max_length:
+            return Finding(TOO_LONG, path, text[:40])
+        return self._search(text, path)
+
+    def scan(self, value: Any, path: str = "") -> Optional[Finding]:
+        """First finding anywhere in ``value``, or None when it is clean."""
+        budget = self.max_length
+        stack: List[Tuple[str, Any]] = [(path, value)]
+        while stack:
+            path, value = stack.pop()
+            if isinstance(value, str):
+                budget -= len(value)
+                if budget < 0:
+                    return Finding(TOO_LONG, path, value[:40])
+                finding = self._search(value, path)
+                if finding:
+                    return finding
+            elif isinstance(value, dict):
+                for key, item in value.items():
+                    key_path = f"{path}.{key}" if path else str(key)
+                    stack.append((key_path, item))
+                    stack.append((key_path, key))
+            elif isinstance(value, (list, tuple)):
+                stack.extend((f"{path}[{i}]", item) for i, item in enumerate(value))
+        return None
+
+    def _search(self, text: str, path: str) -> Optional[Finding]:
+        match = self._pattern.search(text)
+        if match is None:
+            return None
+        return Finding(self._group_rules[match.lastgroup], path, match.group())
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+from uuid import UUID
+
+import httpx
+
+TODO_APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "todo_app-2")
+
+
+class TodoBackend(ABC):
+    """What the MCP tools need from the todo API.
+
+    Results are the API's JSON shapes as Python objects, whichever
+    implementation produced them. A call the API rejects, such as one on
+    a missing todo, raises.
+    """
+
+    @abstractmethod
+    async def create_todo(self, title: str, description: str, priority: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_todos(self, params: Dict[str, Any]) -> Any:
+        """One page: a list, or the todo API's {"items": ..., "next_cursor": ...}."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_todo(self, todo_id: Any, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_todo(self, todo_id: Any) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_todos(self, keyword: str) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpTodoBackend(TodoBackend):
+    """The todo API over HTTP, through one pooled keep-alive client."""
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 10.0,
+        connect_timeout: float = 2.0,
+        max_connections: int = 20,
+        max_concurrency: int = 50
+    ):
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        # Callers beyond max_concurrency wait here rather than queueing
+        # inside the pool until they time out.
+        self.slots = asyncio.Semaphore(max_concurrency)
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        async with self.slots:
+            return await self.client.request(method, path, **kwargs)
+
+    async def create_todo(self, title: str, description: str, priority: str) -> Dict[str, Any]:
+        response = await self.request("POST", "/api/todos", json={
+            "title": title,
+            "description": description,
+            "priority": priority
+        })
+        response.raise_for_status()
+        return response.json()
+
+    async def list_todos(self, params: Dict[str, Any]) -> Any:
+        response = await self.request("GET", "/api/todos", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def update_todo(self, todo_id: Any, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self.request("PUT", f"/api/todos/{todo_id}", json=update_data)
+        response.raise_for_status()
+        return response.json()
+
+    async def delete_todo(self, todo_id: Any) -> None:
+        response = await self.request("DELETE", f"/api/todos/{todo_id}")
+        response.raise_for_status()
+
+    async def search_todos(self, keyword: str) -> Any:
+        response = await self.request("GET", f"/api/todos/search/{keyword}")
+        response.raise_for_status()
+        return response.json()
+
+    async def stats(self) -> Dict[str, Any]:
+        response = await self.request("GET", "/api/todos/stats")
+        response.raise_for_status()
+        return response.json()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class InProcessTodoBackend(TodoBackend):
+    """Calls a todo_app-2 ToDoService directly: no socket and no JSON round
+    trip.
+
+    Todo ids are that service's UUIDs. Reads of the in-memory repository
+    are called on the event loop, as AsyncToDoRepo does. SQLite reads go to
+    a worker thread, and so does every mutation: the service publishes its
+    events through a blocking EventProducer before returning.
+    """
+
+    def __init__(self, service, event_producer=None):
+        # Imported here so an HTTP-only deployment needs none of todo_app-2's dependencies.
+        if TODO_APP_DIR not in sys.path:
+            sys.path.append(TODO_APP_DIR)
+        from models import todo_models
+        from repositories.sqlite_todo_repository import SqliteToDoRepo
+
+        self.models = todo_models
+        self.service = service
+        # Closed with the backend; None when the caller owns the producer.
+        self.event_producer = event_producer
+        self.offload_reads = isinstance(service.repo, SqliteToDoRepo)
+
+    @classmethod
+    def from_env(cls) -> "InProcessTodoBackend":
+        """A service of this backend's own, configured like the todo API's
+        (DATABASE_URL, OUTBOX_DATABASE_URL, RABBITMQ_URL, ...).
+
+        It only sees the API's todos through a SQLite file both use, so any
+        other DATABASE_URL is refused: the in-memory repository would be a
+        private, empty store. When the API runs in this process, pass its
+        service to the constructor instead.
+        """
+        if TODO_APP_DIR not in sys.path:
+            sys.path.append(TODO_APP_DIR)
+        from events.event_producer import EventProducer
+        from repositories.factory import create_todo_repository
+        from repositories.sqlite_todo_repository import sqlite_path
+        from services.todo_service import ToDoService
+
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url or sqlite_path(database_url) is None:
+            raise RuntimeError(
+                "TODO_BACKEND=inprocess needs the todo API's service, or a DATABASE_URL "
+                "naming the SQLite file the API uses"
+            )
+
+        event_producer = EventProducer()
+        repository = create_todo_repository(event_producer)
+        return cls(ToDoService(repository=repository, event_producer=event_producer), event_producer)
+
+    async def create_todo(self, title: str, description: str, priority: str) -> Dict[str, Any]:
+        return await self._write(self.service.create_todo, self.models.Create(title=title, description=description, priority=priority))
+
+    async def list_todos(self, params: Dict[str, Any]) -> Any:
+        pagination = self.models.Pagination(**{key: params[key] for key in ("page", "size", "cursor") if key in params})
+        filters = self.models.Filter(
+            completed=params.get("completed"),
+            priority=[params["priority"]] if params.get("priority") else None
+        )
+        return await self._read(self.service.list_todos, pagination, filters)
+
+    async def update_todo(self, todo_id: Any, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        fields = dict(update_data)
+        if "completed" in fields:
+            fields["is_completed"] = fields.pop("completed")
+        return await self._write(self.service.update_todo, UUID(str(todo_id)), self.models.Update(**fields))
+
+    async def delete_todo(self, todo_id: Any) -> None:
+        await self._write(self.service.delete_todo, UUID(str(todo_id)))
+
+    async def search_todos(self, keyword: str) -> Any:
+        return await self._read(self.service.search_todos, keyword, self.models.Pagination())
+
+    async def stats(self) -> Dict[str, Any]:
+        return await self._read(self.service.get_stats)
+
+    async def close(self) -> None:
+        if self.event_producer is not None:
+            await asyncio.to_thread(self.event_producer.close)
+
+    async def _read(self, method, *args):
+        if self.offload_reads:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _write(self, method, *args):
+        return await asyncio.to_thread(method, *args)
+
+
+def create_backend(service=None) -> TodoBackend:
+    """TODO_BACKEND=inprocess calls ``service``, the todo API's ToDoService
+    when both run in this process, or else one over the API's SQLite file;
+    anything else talks to TODO_BACKEND_URL over HTTP."""
+    if os.getenv("TODO_BACKEND", "http") == "inprocess":
+        if service is not None:
+            return InProcessTodoBackend(service)
+        return InProcessTodoBackend.from_env()
+    return HttpTodoBackend(
+        os.getenv("TODO_BACKEND_URL", "http://localhost:8000"),
+        timeout=float(os.getenv("BACKEND_TIMEOUT", "10.0")),
+        connect_timeout=float(os.getenv("BACKEND_CONNECT_TIMEOUT", "2.0")),
+        max_connections=int(os.getenv("BACKEND_MAX_CONNECTIONS", "20")),
+        max_concurrency=int(os.getenv("BACKEND_MAX_CONCURRENCY", "50"))
+    )
@@ -0,0 +1,90 @@
+"""
+Per-call latency of the MCP backends against the same ToDoService: over
+loopback HTTP to the todo API, and called in-process.
+
+--publish-ms makes every event publish block for that long, like a slow
+broker. "4 creates" then times four concurrent creates, which only
+overlap when the backend keeps the event loop free.
+
+    python server/benchmarks/bench_backends.py --calls 500 --port 8799 --publish-ms 0
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SERVER_DIR)
+from backends import TODO_APP_DIR, HttpTodoBackend, InProcessTodoBackend, TodoBackend
+
+sys.path.append(TODO_APP_DIR)
+import uvicorn
+from fastapi import FastAPI
+
+import routers.todo_router as todo_router
+from benchmarks.helpers import NullProducer
+from repositories.todo_repository import ToDoRepo
+from services.todo_service import ToDoService
+
+
+def start_api(service: ToDoService, port: int) -> uvicorn.Server:
+    todo_router.todo_service = service
+    app = FastAPI()
+    app.include_router(todo_router.router)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def measure(backend: TodoBackend, calls: int) -> dict:
+    created = [await backend.create_todo(f"warm-up {i}", "", "LOW") for i in range(10)]
+    operations = {
+        "create": lambda i: backend.create_todo(f"task {i}", "benchmark", "MEDIUM"),
+        "list 10": lambda i: backend.list_todos({"page": 1, "size": 10}),
+        "update": lambda i: backend.update_todo(created[i % len(created)]["id"], {"title": f"renamed {i}"}),
+        "stats": lambda i: backend.stats(),
+        "4 creates": lambda i: asyncio.gather(*[backend.create_todo(f"task {i}.{j}", "", "LOW") for j in range(4)]),
+    }
+    timings = {}
+    for name, operation in operations.items():
+        started = time.perf_counter()
+        for i in range(calls):
+            await operation(i)
+        timings[name] = (time.perf_counter() - started) / calls
+    return timings
+
+
+async def run(calls: int, port: int, publish_ms: float):
+    producer = NullProducer(publish_ms / 1000)
+    service = ToDoService(ToDoRepo(producer), producer)
+    server = start_api(service, port)
+    backends = {
+        "http": HttpTodoBackend(f"http://127.0.0.1:{port}"),
+        "in-process": InProcessTodoBackend(service),
+    }
+    results = {name: await measure(backend, calls) for name, backend in backends.items()}
+    for backend in backends.values():
+        await backend.close()
+    server.should_exit = True
+
+    print(f"{'':10}" + "".join(f"{name:>14}" for name in results))
+    for operation in results["http"]:
+        row = "".join(f"{results[name][operation] * 1e6:11.0f} us" for name in results)
+        print(f"{operation:10}{row}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--publish-ms", type=float, default=0.0, help="simulated broker latency per event")
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.port, args.publish_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Scan throughput on growing payloads: one re.search per pattern (the old
+check_input_safety) against the compiled InjectionScanner.
+
+    python server/benchmarks/bench_injection_scanner.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(ROOT)
+from injection_scanner import InjectionScanner
+
+RULES = {
+    "drop_table": r'DROP\s+TABLE', "delete_from": r'DELETE\s+FROM', "insert_into": r'INSERT\s+INTO',
+    "update_set": r'UPDATE\s+SET', "union_select": r'UNION\s+SELECT', "script_tag": r'<script',
+    "javascript_url": r'javascript:', "eval_call": r'eval\s*\(', "exec_call": r'exec\s*\('
+}
+
+
+def per_pattern(text: str) -> bool:
+    for pattern in RULES.values():
+        if re.search(pattern, text, re.IGNORECASE):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    scanner = InjectionScanner(RULES, max_length=max(args.sizes))
+    sentence = "Prepare the quarterly report and update the select few tables. "
+    print(f"{'chars':>8} {'per pattern':>14} {'scanner':>14}")
+    for size in args.sizes:
+        text = (sentence * (size // len(sentence) + 1))[:size]
+        assert per_pattern(text) and scanner.scan_text(text) is None
+        old = timeit.timeit(lambda: per_pattern(text), number=args.runs) / args.runs
+        new = timeit.timeit(lambda: scanner.scan_text(text), number=args.runs) / args.runs
+        print(f"{size:8} {size / old / 1e6:10.1f} MB/s {size / new / 1e6:10.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Cost of one rate-limit check: the old per-client timestamp list against
+the GCRA limiter, in memory and on a shared SQLite file.
+
+    python server/benchmarks/bench_rate_limiter.py --checks 200000 --clients 1000 --limit 600
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rate_limiter import RateLimiter, SqliteRateLimiter
+
+
+class TimestampListLimiter:
+    """The previous SecurityGuard.check_rate_limit, for comparison."""
+
+    def __init__(self, requests_per_minute: int):
+        self.rate_limits = {}
+        self.max_requests_per_minute = requests_per_minute
+
+    def allow(self, client_id: str) -> bool:
+        current_time = time.time()
+        if client_id not in self.rate_limits:
+            self.rate_limits[client_id] = []
+        self.rate_limits[client_id] = [
+            req_time for req_time in self.rate_limits[client_id]
+            if current_time - req_time < 60
+        ]
+        if len(self.rate_limits[client_id]) >= self.max_requests_per_minute:
+            return False
+        self.rate_limits[client_id].append(current_time)
+        return True
+
+
+def run(limiter, client_ids: list, checks: int) -> float:
+    started = time.perf_counter()
+    for i in range(checks):
+        limiter.allow(client_ids[i % len(client_ids)])
+    return (time.perf_counter() - started) / checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checks", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=600, help="requests per minute")
+    args = parser.parse_args()
+
+    client_ids = [f"client-{i}" for i in range(args.clients)]
+    random.Random(0).shuffle(client_ids)
+    with tempfile.TemporaryDirectory() as directory:
+        limiters = [
+            ("timestamp list", TimestampListLimiter(args.limit), args.checks),
+            ("GCRA in memory", RateLimiter(args.limit), args.checks),
+            ("GCRA on SQLite", SqliteRateLimiter(os.path.join(directory, "limits.db"), args.limit), args.checks // 10),
+        ]
+        print(f"{args.clients} clients, {args.limit} requests/minute each")
+        for name, limiter, checks in limiters:
+            print(f"  {name:16} {run(limiter, client_ids, checks) * 1e6:8.2f} us/check")
+        # A single busy client shows the list limiter's O(requests per minute) cost.
+        print(f"1 client at its limit of {args.limit}/minute")
+        for name, limiter, checks in limiters[:2]:
+            print(f"  {name:16} {run(limiter, ['busy'], checks) * 1e6:8.2f} us/check")
+
+
+if __name__ == "__main__":
+    main()
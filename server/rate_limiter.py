@@ -0,0 +1,120 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class RateLimiter:
+    """GCRA limiter: a token bucket stored as one number per client.
+
+    Each client keeps its "theoretical arrival time" (TAT), the moment its
+    bucket would be full again. A request is allowed while the TAT is less
+    than ``burst`` intervals ahead of now and pushes it one interval
+    further, so every check is O(1). A client whose TAT has passed has a
+    full bucket and can be forgotten without changing any decision.
+    """
+
+    def __init__(self, requests_per_minute: int, burst: Optional[int] = None, max_clients: int = 100_000):
+        self.interval = 60.0 / requests_per_minute
+        self.tolerance = self.interval * ((burst or requests_per_minute) - 1)
+        self.max_clients = max_clients
+        # Least recently seen first, which is where idle clients collect.
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, client_id: str, now: Optional[float] = None, cost: int = 1) -> bool:
+        """Take ``cost`` requests from the client's bucket, all or none."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tat = max(self._tats.get(client_id, now), now)
+            allowed = tat - now + self.interval * (cost - 1) <= self.tolerance
+            if allowed:
+                self._tats[client_id] = tat + self.interval * cost
+                self._tats.move_to_end(client_id)
+            self._evict(now)
+        return allowed
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def _evict(self, now: float) -> None:
+        # Only clients whose TAT has passed are dropped: their bucket is full,
+        # so forgetting them changes no decision, whereas dropping an active
+        # client would hand it a fresh burst. Past max_clients, active
+        # clients at the front are moved back so the idle ones behind them
+        # are reached; the table only stays above max_clients while that many
+        # clients really are active. A few entries per call: amortised O(1).
+        for _ in range(2 if len(self._tats) <= self.max_clients else 16):
+            if not self._tats:
+                return
+            client_id, tat = next(iter(self._tats.items()))
+            if tat <= now:
+                del self._tats[client_id]
+            elif len(self._tats) > self.max_clients:
+                self._tats.move_to_end(client_id)
+            else:
+                return
+
+
+class SqliteRateLimiter(RateLimiter):
+    """RateLimiter whose TATs live in a SQLite file shared by several
+    server processes, so they enforce one limit together.
+
+    A decision is one upsert statement, atomic under SQLite's write lock.
+    Times are wall-clock, since monotonic clocks differ between processes.
+    There is no max_clients bound: every ``prune_every`` calls the rows
+    whose TAT has passed are deleted, and active clients are never dropped,
+    so the table holds the clients still inside their burst window plus
+    those that left it since the last prune.
+    """
+
+    UPSERT = (
+        "INSERT INTO rate_limits (client_id, tat) "
+        "SELECT :client_id, :now + :interval * :cost WHERE :interval * (:cost - 1) <= :tolerance "
+        "ON CONFLICT (client_id) DO UPDATE SET tat = max(tat, :now) + :interval * :cost "
+        "WHERE max(tat, :now) - :now + :interval * (:cost - 1) <= :tolerance"
+    )
+
+    def __init__(
+        self,
+        path: str,
+        requests_per_minute: int,
+        burst: Optional[int] = None,
+        prune_every: int = 1000
+    ):
+        super().__init__(requests_per_minute, burst)
+        self.path = path
+        self.prune_every = prune_every
+        self._calls = 0
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (client_id TEXT PRIMARY KEY, tat REAL NOT NULL)"
+        )
+
+    def allow(self, client_id: str, now: Optional[float] = None, cost: int = 1) -> bool:
+        now = time.time() if now is None else now
+        connection = self._connection()
+        allowed = connection.execute(self.UPSERT, {
+            "client_id": client_id,
+            "now": now,
+            "interval": self.interval,
+            "cost": cost,
+            "tolerance": self.tolerance
+        }).rowcount == 1
+        self._calls += 1
+        if self._calls % self.prune_every == 0:
+            connection.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+        return allowed
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA busy_timeout=5000")
+            self._local.connection = connection
+        return connection
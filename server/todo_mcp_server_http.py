@@ -1,16 +1,59 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-import requests
-import re
-import time
+from typing import List, Dict, Any, Optional, AsyncIterator
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import os
+import sys
 import logging
 
+from backends import TodoBackend, create_backend
+from rate_limiter import RateLimiter, SqliteRateLimiter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from injection_scanner import InjectionScanner
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Todo MCP Server", version="1.0.0")
+RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "30"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", str(RATE_LIMIT_PER_MINUTE)))
+# Set to a file path so several server workers share one limit.
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH")
+CLIENT_ID_HEADER = os.getenv("CLIENT_ID_HEADER", "X-Client-Id")
+# Clients are rate limited by peer address. The client id header is only
+# believed from TRUSTED_PROXIES (comma-separated peer addresses of gateways
+# that set it), or from anyone with TRUST_CLIENT_ID_HEADER=true; otherwise
+# a caller could send a fresh id with every request.
+TRUSTED_PROXIES = {address.strip() for address in os.getenv("TRUSTED_PROXIES", "").split(",") if address.strip()}
+TRUST_CLIENT_ID_HEADER = os.getenv("TRUST_CLIENT_ID_HEADER", "false").lower() == "true"
+BATCH_MAX_CALLS = int(os.getenv("BATCH_MAX_CALLS", "50"))
+# Todos fetched per backend request while streaming.
+STREAM_PAGE_SIZE = int(os.getenv("STREAM_PAGE_SIZE", "100"))
+
+# Arguments each tool cannot run without, checked before a batch starts.
+REQUIRED_ARGUMENTS = {
+    "create_todo_secure": ("title",),
+    "get_todos_filtered": (),
+    "update_todo_secure": ("todo_id",),
+    "delete_todo_secure": ("todo_id",),
+    "search_todos_by_keyword": ("keyword",)
+}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # TODO_BACKEND picks HTTP (one pooled keep-alive client for the
+    # process) or direct calls into the todo service; see backends.py.
+    # A process that also hosts the todo API sets app.state.todo_service
+    # to its ToDoService so both serve the same todos.
+    app.state.backend = create_backend(getattr(app.state, "todo_service", None))
+    yield
+    await app.state.backend.close()
+
+app = FastAPI(title="Todo MCP Server", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,39 +65,48 @@ app.add_middleware(
 
 class SecurityGuard:
     def __init__(self):
-        self.rate_limits = {}
-        self.max_requests_per_minute = 30
-        self.dangerous_patterns = [
-            r'DROP\s+TABLE', r'DELETE\s+FROM', r'INSERT\s+INTO',
-            r'UPDATE\s+SET', r'UNION\s+SELECT', r'<script',
-            r'javascript:', r'eval\s*\(', r'exec\s*\('
-        ]
+        self.max_requests_per_minute = RATE_LIMIT_PER_MINUTE
+        if RATE_LIMIT_SQLITE_PATH:
+            self.rate_limiter = SqliteRateLimiter(RATE_LIMIT_SQLITE_PATH, RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST)
+        else:
+            self.rate_limiter = RateLimiter(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST)
+        self.dangerous_patterns = {
+            "drop_table": r'DROP\s+TABLE', "delete_from": r'DELETE\s+FROM', "insert_into": r'INSERT\s+INTO',
+            "update_set": r'UPDATE\s+SET', "union_select": r'UNION\s+SELECT', "script_tag": r'<script',
+            "javascript_url": r'javascript:', "eval_call": r'eval\s*\(', "exec_call": r'exec\s*\('
+        }
+        self.scanner = InjectionScanner(
+            self.dangerous_patterns,
+            max_length=int(os.getenv("SCAN_MAX_LENGTH", "100000"))
+        )
     
-    def check_rate_limit(self, client_id: str = "default") -> bool:
-        current_time = time.time()
-        if client_id not in self.rate_limits:
-            self.rate_limits[client_id] = []
-        
-        self.rate_limits[client_id] = [
-            req_time for req_time in self.rate_limits[client_id]
-            if current_time - req_time < 60
-        ]
-        
-        if len(self.rate_limits[client_id]) >= self.max_requests_per_minute:
-            return False
-        
-        self.rate_limits[client_id].append(current_time)
-        return True
+    def check_rate_limit(self, client_id: str = "default", cost: int = 1) -> bool:
+        return self.rate_limiter.allow(client_id, cost=cost)
     
     def check_input_safety(self, input_text: str) -> bool:
-        for pattern in self.dangerous_patterns:
-            if re.search(pattern, input_text, re.IGNORECASE):
-                logger.warning(f"Suspicious pattern: {pattern}")
-                return False
-        return True
+        return self.find_violation(input_text) is None
+
+    def find_violation(self, value: Any) -> Optional[str]:
+        """Path of the first unsafe string in ``value``, or None."""
+        finding = self.scanner.scan(value)
+        if finding is None:
+            return None
+        logger.warning(f"Suspicious pattern {finding.rule} in {finding.path or 'input'}: {finding.excerpt!r}")
+        return finding.path
 
 security_guard = SecurityGuard()
 
+def client_id_of(request: Request) -> str:
+    peer = request.client.host if request.client else "default"
+    if TRUST_CLIENT_ID_HEADER or peer in TRUSTED_PROXIES:
+        client_id = request.headers.get(CLIENT_ID_HEADER)
+        if client_id:
+            return client_id
+    return peer
+
+def backend() -> TodoBackend:
+    return app.state.backend
+
 class ToolCall(BaseModel):
     name: str
     arguments: Dict[str, Any]
@@ -63,6 +115,75 @@ class MCPResponse(BaseModel):
     content: List[Dict[str, str]]
     isError: Optional[bool] = False
 
+class BatchToolCall(BaseModel):
+    calls: List[ToolCall]
+
+class BatchResponse(BaseModel):
+    results: List[MCPResponse]
+
+def error_response(text: str) -> MCPResponse:
+    return MCPResponse(content=[{"type": "text", "text": text}], isError=True)
+
+def guard_call(tool_call: ToolCall, request: Request) -> Optional[MCPResponse]:
+    """Error response when the call may not run, else None."""
+    if not security_guard.check_rate_limit(client_id_of(request)):
+        return error_response("Rate limit exceeded. Please try again later.")
+    violation = security_guard.find_violation(tool_call.arguments)
+    if violation is not None:
+        return error_response(f"Security violation detected in parameter: {violation}")
+    return None
+
+async def iter_todos(params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Every todo matching ``params``, one backend page at a time.
+
+    Understands both a plain list page (page/size) and the todo API's
+    {"items": [...], "next_cursor": ...} page, which it follows by cursor.
+    """
+    page, cursor = 1, None
+    while True:
+        page_params = dict(params, size=STREAM_PAGE_SIZE)
+        if cursor:
+            page_params["cursor"] = cursor
+        else:
+            page_params["page"] = page
+        data = await backend().list_todos(page_params)
+        items = data["items"] if isinstance(data, dict) else data
+        for todo in items:
+            yield todo
+        if isinstance(data, dict):
+            cursor = data.get("next_cursor")
+            if not cursor:
+                return
+        elif len(items) < STREAM_PAGE_SIZE:
+            return
+        page += 1
+
+async def encode_stream(chunks: AsyncIterator[Dict[str, Any]], sse: bool) -> AsyncIterator[str]:
+    """NDJSON lines, or SSE events named after each chunk's type."""
+    try:
+        async for chunk in chunks:
+            data = json.dumps(chunk, ensure_ascii=False)
+            yield f"event: {chunk['type']}\ndata: {data}\n\n" if sse else data + "\n"
+    except Exception as e:
+        # Headers are gone already; the error travels as the last chunk.
+        data = json.dumps({"type": "error", "text": f"❌ Error: {str(e)}"}, ensure_ascii=False)
+        yield f"event: error\ndata: {data}\n\n" if sse else data + "\n"
+
+async def todo_chunks(params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    count = 0
+    async for todo in iter_todos(params):
+        count += 1
+        yield {"type": "todo", "todo": todo}
+    yield {"type": "done", "count": count}
+
+def stream_response(chunks: AsyncIterator[Dict[str, Any]], request: Request, format: Optional[str]) -> StreamingResponse:
+    sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+    return StreamingResponse(
+        encode_stream(chunks, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache"}
+    )
+
 @app.get("/")
 async def root():
     return {"message": "Todo MCP Server", "version": "1.0.0"}
@@ -160,28 +281,40 @@ async def get_capabilities():
     }
 
 @app.post("/mcp/tools/call")
-async def call_tool(tool_call: ToolCall) -> MCPResponse:
-    if not security_guard.check_rate_limit():
-        return MCPResponse(
-            content=[{"type": "text", "text": "Rate limit exceeded. Please try again later."}],
-            isError=True
-        )
-    
-    for key, value in tool_call.arguments.items():
-        if isinstance(value, str) and not security_guard.check_input_safety(value):
-            return MCPResponse(
-                content=[{"type": "text", "text": f"Security violation detected in parameter: {key}"}],
-                isError=True
-            )
+async def call_tool(tool_call: ToolCall, request: Request) -> MCPResponse:
+    rejected = guard_call(tool_call, request)
+    if rejected is not None:
+        return rejected
     
+    return await execute_tool(tool_call)
+
+@app.post("/mcp/tools/call/stream")
+async def call_tool_stream(
+    tool_call: ToolCall,
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(sse|ndjson)$", description="defaults to the Accept header")
+):
+    """Streams get_todos_filtered one todo per chunk; other tools arrive as one result chunk."""
+    rejected = guard_call(tool_call, request)
+    if rejected is None and tool_call.name == "get_todos_filtered":
+        params = {key: tool_call.arguments[key] for key in ("priority", "completed") if key in tool_call.arguments}
+        return stream_response(todo_chunks(params), request, format)
+
+    async def single() -> AsyncIterator[Dict[str, Any]]:
+        response = rejected or await execute_tool(tool_call)
+        yield {"type": "result", **response.model_dump()}
+
+    return stream_response(single(), request, format)
+
+async def execute_tool(tool_call: ToolCall) -> MCPResponse:
     try:
         if tool_call.name == "create_todo_secure":
-            response = requests.post("http://localhost:8000/api/todos", json={
-                "title": tool_call.arguments["title"],
-                "description": tool_call.arguments.get("description", ""),
-                "priority": tool_call.arguments.get("priority", "MEDIUM")
-            })
-            result = f"✅ Created todo: {response.json()}"
+            created = await backend().create_todo(
+                tool_call.arguments["title"],
+                tool_call.arguments.get("description", ""),
+                tool_call.arguments.get("priority", "MEDIUM")
+            )
+            result = f"✅ Created todo: {created}"
             
         elif tool_call.name == "get_todos_filtered":
             params = {}
@@ -190,25 +323,24 @@ async def call_tool(tool_call: ToolCall) -> MCPResponse:
             if "completed" in tool_call.arguments:
                 params["completed"] = tool_call.arguments["completed"]
             
-            response = requests.get("http://localhost:8000/api/todos", params=params)
-            todos = response.json()
+            page = await backend().list_todos(params)
+            todos = page["items"] if isinstance(page, dict) else page
             result = f"📋 Found {len(todos)} todos: {todos}"
             
         elif tool_call.name == "update_todo_secure":
             todo_id = tool_call.arguments["todo_id"]
             update_data = {k: v for k, v in tool_call.arguments.items() if k != "todo_id"}
-            response = requests.put(f"http://localhost:8000/api/todos/{todo_id}", json=update_data)
-            result = f"✏️ Updated todo: {response.json()}"
+            updated = await backend().update_todo(todo_id, update_data)
+            result = f"✏️ Updated todo: {updated}"
             
         elif tool_call.name == "delete_todo_secure":
             todo_id = tool_call.arguments["todo_id"]
-            response = requests.delete(f"http://localhost:8000/api/todos/{todo_id}")
+            await backend().delete_todo(todo_id)
             result = f"🗑️ Deleted todo {todo_id}"
             
         elif tool_call.name == "search_todos_by_keyword":
             keyword = tool_call.arguments["keyword"]
-            response = requests.get(f"http://localhost:8000/api/todos/search/{keyword}")
-            results = response.json()
+            results = await backend().search_todos(keyword)
             result = f"🔍 Search results for '{keyword}': {results}"
         else:
             result = f"❌ Unknown tool: {tool_call.name}"
@@ -221,6 +353,61 @@ async def call_tool(tool_call: ToolCall) -> MCPResponse:
             isError=True
         )
 
+def validate_call(tool_call: ToolCall) -> Optional[str]:
+    if tool_call.name not in REQUIRED_ARGUMENTS:
+        return f"❌ Unknown tool: {tool_call.name}"
+    missing = [name for name in REQUIRED_ARGUMENTS[tool_call.name] if name not in tool_call.arguments]
+    if missing:
+        return f"❌ Missing arguments for {tool_call.name}: {', '.join(missing)}"
+    todo_id = tool_call.arguments.get("todo_id")
+    if todo_id is not None and (isinstance(todo_id, bool) or not isinstance(todo_id, (str, int))):
+        return f"❌ todo_id must be a string or an integer, got {type(todo_id).__name__}"
+    return None
+
+@app.post("/mcp/tools/call/batch")
+async def call_tools(batch: BatchToolCall, request: Request) -> BatchResponse:
+    calls = batch.calls
+    client_id = client_id_of(request)
+    if len(calls) > BATCH_MAX_CALLS:
+        # Still charged, so oversized batches are not free to send.
+        security_guard.check_rate_limit(client_id)
+        raise HTTPException(status_code=400, detail=f"A batch holds at most {BATCH_MAX_CALLS} calls")
+    # The batch costs as many requests as it holds calls, taken all at once
+    # and before validation, so malformed batches cost the same.
+    if not security_guard.check_rate_limit(client_id, cost=len(calls)):
+        return BatchResponse(results=[
+            error_response("Rate limit exceeded. Please try again later.") for _ in calls
+        ])
+
+    # Every call is checked before any runs, so a bad batch changes nothing.
+    problems = [validate_call(tool_call) for tool_call in calls]
+    for index, tool_call in enumerate(calls):
+        violation = security_guard.find_violation(tool_call.arguments)
+        if violation is not None:
+            problems[index] = f"Security violation detected in parameter: {violation}"
+    if any(problems):
+        return BatchResponse(results=[
+            error_response(problem or "Not executed: another call in the batch is invalid")
+            for problem in problems
+        ])
+
+    # Calls on the same todo_id run in order; everything else runs concurrently.
+    # validate_call has made every todo_id a str or int; 7 and "7" are one todo.
+    chains: Dict[Any, List[int]] = {}
+    for index, tool_call in enumerate(calls):
+        todo_id = tool_call.arguments.get("todo_id")
+        key = ("todo", str(todo_id)) if todo_id is not None else ("call", index)
+        chains.setdefault(key, []).append(index)
+
+    results: List[Optional[MCPResponse]] = [None] * len(calls)
+
+    async def run_chain(indexes: List[int]):
+        for index in indexes:
+            results[index] = await execute_tool(calls[index])
+
+    await asyncio.gather(*(run_chain(indexes) for indexes in chains.values()))
+    return BatchResponse(results=results)
+
 @app.get("/mcp/resources")
 async def get_resources():
     return {
@@ -242,15 +429,15 @@ async def get_resources():
 async def read_resource(uri: str):
     try:
         if uri == "todos://all":
-            response = requests.get("http://localhost:8000/api/todos")
-            return {"contents": [{"type": "text", "text": response.text}]}
+            todos = await backend().list_todos({})
+            return {"contents": [{"type": "text", "text": json.dumps(todos, ensure_ascii=False)}]}
         elif uri == "todos://stats":
-            response = requests.get("http://localhost:8000/api/todos")
-            todos = response.json()
+            # The backend keeps these counts current; nothing is listed here.
+            backend_stats = await backend().stats()
             stats = {
-                "total": len(todos),
-                "completed": len([t for t in todos if t.get("completed", False)]),
-                "high_priority": len([t for t in todos if t.get("priority") == "HIGH"])
+                "total": backend_stats["total"],
+                "completed": backend_stats["completed"],
+                "high_priority": backend_stats["by_priority"].get("HIGH", 0)
             }
             return {"contents": [{"type": "text", "text": str(stats)}]}
         else:
@@ -258,6 +445,16 @@ async def read_resource(uri: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/mcp/resources/read/stream")
+async def read_resource_stream(
+    uri: str,
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(sse|ndjson)$", description="defaults to the Accept header")
+):
+    if uri != "todos://all":
+        raise HTTPException(status_code=404, detail=f"Unknown streaming resource: {uri}")
+    return stream_response(todo_chunks({}), request, format)
+
 @app.get("/mcp/prompts")
 async def get_prompts():
     return {
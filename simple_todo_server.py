@@ -1,8 +1,15 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
+from collections import Counter
+from itertools import islice
+import os
+import sys
 import uvicorn
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "todo_app-2"))
+from repositories.search_index import SearchIndex, SubstringIndex
+
 app = FastAPI(title="Todo API for Lab 4")
 
 class TodoCreate(BaseModel):
@@ -23,8 +30,19 @@ class Todo(BaseModel):
     priority: str = "MEDIUM"
     completed: bool = False
 
-todos_db = []
+# Keyed by id; dicts keep insertion order, so listing order is unchanged.
+todos_db: Dict[int, Todo] = {}
 next_id = 1
+search_index = SearchIndex()
+substring_index = SubstringIndex()
+# Running counts, updated by every write so /stats never scans todos_db.
+stats = {"total": 0, "completed": 0}
+priority_counts: Counter = Counter()
+
+def count_todo(todo: Todo, delta: int):
+    stats["total"] += delta
+    stats["completed"] += delta if todo.completed else 0
+    priority_counts[todo.priority] += delta
 
 @app.post("/api/todos", response_model=Todo)
 def create_todo(todo: TodoCreate):
@@ -36,27 +54,76 @@ def create_todo(todo: TodoCreate):
         priority=todo.priority,
         completed=False
     )
-    todos_db.append(new_todo)
+    todos_db[new_todo.id] = new_todo
+    search_index.add(new_todo.id, new_todo.title, new_todo.description)
+    substring_index.add(new_todo.id, new_todo.title, new_todo.description)
+    count_todo(new_todo, 1)
     next_id += 1
     return new_todo
 
 @app.get("/api/todos", response_model=List[Todo])
-def get_todos():
-    return todos_db
+def get_todos(
+    priority: Optional[str] = None,
+    completed: Optional[bool] = None,
+    page: int = Query(1, ge=1),
+    size: Optional[int] = Query(None, ge=1, le=1000)
+):
+    todos = todos_db.values()
+    if priority is not None or completed is not None:
+        todos = (
+            t for t in todos
+            if (priority is None or t.priority == priority)
+            and (completed is None or t.completed == completed)
+        )
+    if size is None:
+        return list(todos)
+    start = (page - 1) * size
+    return list(islice(todos, start, start + size))
+
+@app.get("/api/todos/stats")
+def get_stats():
+    return {
+        "total": stats["total"],
+        "completed": stats["completed"],
+        "open": stats["total"] - stats["completed"],
+        "by_priority": {priority: count for priority, count in priority_counts.items() if count}
+    }
+
+def find_todos(query: str) -> List[Todo]:
+    """Todos containing every word of the query (each word also as a
+    prefix), best first, then the other todos whose title or description
+    contains the query as a substring, which is what search has always
+    matched. Both come from indexes, so the cost follows the number of
+    matches rather than the number of todos."""
+    _, ids = search_index.search(query)
+    found = dict.fromkeys(ids)
+    found.update(dict.fromkeys(sorted(substring_index.search(query) - found.keys())))
+    return [todos_db[todo_id] for todo_id in found]
+
+# Declared before "/api/todos/{todo_id}" so "search" is not parsed as an id.
+@app.get("/api/todos/search", response_model=List[Todo])
+def search_todos_query(
+    q: str = Query(..., min_length=1),
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100)
+):
+    start = (page - 1) * size
+    return find_todos(q)[start:start + size]
 
 @app.get("/api/todos/{todo_id}", response_model=Todo)
 def get_todo(todo_id: int):
-    todo = next((t for t in todos_db if t.id == todo_id), None)
+    todo = todos_db.get(todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
     return todo
 
 @app.put("/api/todos/{todo_id}", response_model=Todo)
 def update_todo(todo_id: int, todo_update: TodoUpdate):
-    todo = next((t for t in todos_db if t.id == todo_id), None)
+    todo = todos_db.get(todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
     
+    count_todo(todo, -1)
     if todo_update.title is not None:
         todo.title = todo_update.title
     if todo_update.description is not None:
@@ -65,27 +132,27 @@ def update_todo(todo_id: int, todo_update: TodoUpdate):
         todo.priority = todo_update.priority
     if todo_update.completed is not None:
         todo.completed = todo_update.completed
+    count_todo(todo, 1)
+    if todo_update.title is not None or todo_update.description is not None:
+        search_index.add(todo.id, todo.title, todo.description)
+        substring_index.add(todo.id, todo.title, todo.description)
     
     return todo
 
 @app.delete("/api/todos/{todo_id}")
 def delete_todo(todo_id: int):
-    global todos_db
-    todo = next((t for t in todos_db if t.id == todo_id), None)
-    if not todo:
+    todo = todos_db.pop(todo_id, None)
+    if todo is None:
         raise HTTPException(status_code=404, detail="Todo not found")
     
-    todos_db = [t for t in todos_db if t.id != todo_id]
+    count_todo(todo, -1)
+    search_index.remove(todo_id)
+    substring_index.remove(todo_id)
     return {"message": "Todo deleted successfully"}
 
 @app.get("/api/todos/search/{query}", response_model=List[Todo])
 def search_todos(query: str):
-    results = [
-        todo for todo in todos_db 
-        if query.lower() in todo.title.lower() or 
-           (todo.description and query.lower() in todo.description.lower())
-    ]
-    return results
+    return find_todos(query)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import httpx
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+import simple_todo_server
+import todo_mcp_server_http
+from backends import HttpTodoBackend
+
+
+def test_batch_reports_each_call_outcome():
+    backend = HttpTodoBackend("http://todo-api")
+    backend.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=simple_todo_server.app), base_url="http://todo-api")
+    todo_mcp_server_http.app.state.backend = backend
+    todo_id = TestClient(simple_todo_server.app).post("/api/todos", json={"title": "batched"}).json()["id"]
+
+    client = TestClient(todo_mcp_server_http.app)
+    response = client.post("/mcp/tools/call/batch", json={"calls": [
+        {"name": "delete_todo_secure", "arguments": {"todo_id": 999999}},
+        {"name": "update_todo_secure", "arguments": {"todo_id": todo_id, "completed": True}},
+        {"name": "update_todo_secure", "arguments": {"todo_id": 999999, "title": "missing"}},
+    ]})
+
+    results = response.json()["results"]
+    assert [result["isError"] for result in results] == [True, False, True]
+    assert "404" in results[0]["content"][0]["text"]
+    assert simple_todo_server.todos_db[todo_id].completed
+
+
+def test_backends_raise_on_a_missing_todo():
+    import asyncio
+    from uuid import uuid4
+
+    import pytest
+    from backends import InProcessTodoBackend, TodoBackend
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'todo_app-2'))
+    from events.mock_event_producer import MockEventProducer
+    from repositories.todo_repository import ToDoRepo
+    from services.todo_service import ToDoService
+
+    class Incomplete(TodoBackend):
+        async def create_todo(self, title, description, priority):
+            return {}
+    with pytest.raises(TypeError):
+        Incomplete()
+
+    producer = MockEventProducer()
+    http = HttpTodoBackend("http://todo-api")
+    http.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=simple_todo_server.app), base_url="http://todo-api")
+    cases = [
+        (InProcessTodoBackend(ToDoService(ToDoRepo(producer), producer)), str(uuid4())),
+        (http, 999999),
+    ]
+    for backend, missing_id in cases:
+        with pytest.raises(Exception):
+            asyncio.run(backend.delete_todo(missing_id))
+        with pytest.raises(Exception):
+            asyncio.run(backend.update_todo(missing_id, {"title": "missing"}))
@@ -0,0 +1,68 @@
+import os
+import sys
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'todo_app-2'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'todo_app-2', 'consumer'))
+
+from dedup import DedupCache, Deduplicator, SqliteDedupWindow
+from events.event_producer import EventProducer
+
+
+def test_same_message_id_is_a_duplicate_new_one_is_not():
+    deduplicator = Deduplicator(DedupCache())
+    first, second = str(uuid4()), str(uuid4())
+
+    assert not deduplicator.is_duplicate(first)
+    deduplicator.mark_processed(first)
+    assert deduplicator.is_duplicate(first)
+    assert not deduplicator.is_duplicate(second)
+
+
+def test_failed_message_is_not_recorded():
+    # Ids are recorded only after success, so a retried message runs again.
+    deduplicator = Deduplicator(DedupCache())
+    event_id = str(uuid4())
+    assert not deduplicator.is_duplicate(event_id)
+    assert not deduplicator.is_duplicate(event_id)
+
+
+def test_messages_without_id_are_never_duplicates():
+    deduplicator = Deduplicator(DedupCache())
+    deduplicator.mark_processed(None)
+    assert not deduplicator.is_duplicate(None)
+    assert not deduplicator.is_duplicate("")
+
+
+def test_cache_is_bounded():
+    cache = DedupCache(max_entries=3)
+    ids = [str(uuid4()) for _ in range(5)]
+    for event_id in ids:
+        cache.add(event_id)
+    assert len(cache) == 3
+    assert not cache.contains(ids[0])
+    assert cache.contains(ids[-1])
+
+
+def test_sqlite_window_catches_what_the_cache_forgot(tmp_path):
+    window = SqliteDedupWindow(str(tmp_path / "dedup.db"))
+    event_id = str(uuid4())
+    Deduplicator(DedupCache(), window).mark_processed(event_id)
+
+    # A restarted consumer has an empty cache but the same window.
+    restarted = Deduplicator(DedupCache(), window)
+    assert restarted.is_duplicate(event_id)
+    assert not restarted.is_duplicate(str(uuid4()))
+    window.close()
+
+
+def test_identical_changes_get_distinct_ids_and_redelivery_keeps_its_id():
+    # A todo toggled back to an earlier state is a new event, not a duplicate.
+    producer = EventProducer(pool=object())
+    payload = {"id": str(uuid4()), "is_completed": True}
+    _, first = producer._encode("todo_updated", payload)
+    _, second = producer._encode("todo_updated", payload)
+    assert first.message_id != second.message_id
+
+    _, relayed = producer._encode("todo_updated", payload, first.message_id)
+    assert relayed.message_id == first.message_id
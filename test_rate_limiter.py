@@ -0,0 +1,64 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from rate_limiter import RateLimiter, SqliteRateLimiter
+
+
+def limiters(tmp_path, requests_per_minute, burst):
+    return [
+        RateLimiter(requests_per_minute, burst),
+        SqliteRateLimiter(str(tmp_path / "limits.db"), requests_per_minute, burst),
+    ]
+
+
+def test_burst_then_refill(tmp_path):
+    # 60 per minute is one request a second, with up to 5 at once.
+    for limiter in limiters(tmp_path, 60, 5):
+        assert all(limiter.allow("a", now=1000.0) for _ in range(5))
+        assert not limiter.allow("a", now=1000.0)
+        assert not limiter.allow("a", now=1000.9)
+        assert limiter.allow("a", now=1001.0)
+        assert not limiter.allow("a", now=1001.0)
+        # After a full idle period the whole burst is back.
+        assert all(limiter.allow("a", now=1010.0) for _ in range(5))
+
+
+def test_clients_are_limited_separately(tmp_path):
+    for limiter in limiters(tmp_path, 60, 2):
+        assert limiter.allow("a", now=0.0) and limiter.allow("a", now=0.0)
+        assert not limiter.allow("a", now=0.0)
+        assert limiter.allow("b", now=0.0)
+
+
+def test_cost_is_taken_all_or_nothing(tmp_path):
+    for limiter in limiters(tmp_path, 60, 5):
+        assert limiter.allow("a", now=0.0, cost=3)
+        # Only two requests are left: a cost of three is refused and takes nothing.
+        assert not limiter.allow("a", now=0.0, cost=3)
+        assert limiter.allow("a", now=0.0, cost=2)
+        assert not limiter.allow("a", now=0.0)
+        # A cost above the burst can never pass.
+        assert not limiter.allow("b", now=0.0, cost=6)
+        assert limiter.allow("b", now=0.0, cost=5)
+
+
+def test_idle_clients_are_forgotten():
+    limiter = RateLimiter(60, 1, max_clients=100)
+    for i in range(1000):
+        limiter.allow(f"client-{i}", now=float(i))
+    assert len(limiter) <= 100
+
+
+def test_active_clients_are_kept_past_max_clients():
+    limiter = RateLimiter(60, 3, max_clients=10)
+    assert all(limiter.allow("abuser", now=0.0) for _ in range(3))
+    for i in range(100):
+        limiter.allow(f"client-{i}", now=0.5)
+    # Evicting the abuser would have reset its bucket.
+    assert not limiter.allow("abuser", now=0.5)
+    # Once the others are idle the table shrinks back.
+    for i in range(100):
+        limiter.allow(f"late-{i}", now=10.0 + i)
+    assert len(limiter) <= 10
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pika
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'todo_app-2', 'consumer'))
+
+from retry import RETRY_COUNT_HEADER, RetryRouter, parse_delays
+
+
+class RecordingChannel:
+    def __init__(self):
+        self.published = []
+        self.declared = {}
+
+    def basic_publish(self, exchange, routing_key, body, properties):
+        self.published.append((routing_key, body, properties))
+
+    def queue_declare(self, queue, durable, arguments=None):
+        self.declared[queue] = arguments
+
+
+def test_failures_walk_the_tiers_then_reach_the_dlq():
+    router = RetryRouter("todo", "todo.dlq", parse_delays("1, 10,60"))
+    channel = RecordingChannel()
+    properties = pika.BasicProperties(message_id="event-1", content_type="application/json")
+
+    targets = []
+    for _ in range(4):
+        targets.append(router.route_failure(channel, properties, b"{}", ValueError("boom")))
+        properties = channel.published[-1][2]
+
+    assert targets == ["todo.retry.1000ms", "todo.retry.10000ms", "todo.retry.60000ms", "todo.dlq"]
+    assert [published[2].headers[RETRY_COUNT_HEADER] for published in channel.published] == [1, 2, 3, 4]
+    # The id survives every hop, so dedup still recognises the event.
+    assert {published[2].message_id for published in channel.published} == {"event-1"}
+
+
+def test_tier_queues_dead_letter_back_to_the_work_queue():
+    router = RetryRouter("todo", "todo.dlq", [0.5, 30])
+    channel = RecordingChannel()
+    router.declare(channel)
+
+    assert channel.declared["todo.dlq"] is None
+    assert channel.declared["todo.retry.500ms"] == {
+        "x-message-ttl": 500,
+        "x-dead-letter-exchange": "",
+        "x-dead-letter-routing-key": "todo",
+    }
+    assert channel.declared["todo.retry.30000ms"]["x-message-ttl"] == 30000
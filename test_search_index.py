@@ -0,0 +1,43 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'todo_app-2'))
+
+from repositories.search_index import SubstringIndex
+
+WORDS = ["Report", "weekly", "groceries", "review", "deploy", "ÉTÉ", "a", "re"]
+
+
+def test_substring_index_matches_a_scan():
+    rng = random.Random(7)
+    index, texts = SubstringIndex(), {}
+    for doc_id in range(300):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        description = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 3))) or None
+        index.add(doc_id, title, description)
+        texts[doc_id] = (title, description)
+    for doc_id in range(0, 300, 3):
+        index.remove(doc_id)
+        del texts[doc_id]
+    index.add(1, "renamed", None)
+    texts[1] = ("renamed", None)
+
+    for query in ["r", "RE", "rep", "ort wee", "groceries", "eekly rev", "été", "zzz", "ed"]:
+        needle = query.lower()
+        expected = {
+            doc_id for doc_id, (title, description) in texts.items()
+            if needle in title.lower() or (description and needle in description.lower())
+        }
+        assert index.search(query) == expected, query
+
+
+def test_legacy_search_route_returns_every_match():
+    from fastapi.testclient import TestClient
+    import simple_todo_server
+
+    client = TestClient(simple_todo_server.app)
+    for i in range(60):
+        client.post("/api/todos", json={"title": f"task {i}", "description": "prefix"})
+    assert len(client.get("/api/todos/search/refix").json()) == 60
+    assert len(client.get("/api/todos/search", params={"q": "refix", "size": 25, "page": 3}).json()) == 10
@@ -0,0 +1,223 @@
+import functools
+import itertools
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from uuid import UUID
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'todo_app-2'))
+
+import repositories.sqlite_todo_repository as sqlite_module
+import repositories.todo_record as record_module
+from events.mock_event_producer import MockEventProducer
+from events.outbox import OutboxRelay
+from models.enums import PriorityEnum
+from models.todo_models import Create, Filter, Pagination
+from repositories.sqlite_todo_repository import SqliteToDoRepo
+from repositories.todo_repository import ToDoRepo
+from services.todo_service import ToDoService
+
+TODAY = date.today()
+
+FILTERS = [
+    Filter(),
+    Filter(completed=True),
+    Filter(completed=False, priority=[PriorityEnum.HIGH]),
+    Filter(priority=[PriorityEnum.LOW, PriorityEnum.MEDIUM]),
+    Filter(due_after=TODAY + timedelta(days=2), due_before=TODAY + timedelta(days=5)),
+    Filter(completed=False, due_before=TODAY + timedelta(days=3)),
+]
+
+
+@pytest.fixture
+def services(monkeypatch):
+    """An in-memory and a SQLite service holding the same todos under the same ids."""
+    producer = MockEventProducer()
+    sqlite_repository = SqliteToDoRepo("sqlite://", producer)
+    memory = ToDoService(ToDoRepo(producer), producer)
+    sqlite = ToDoService(sqlite_repository, producer)
+    # Each repository draws ids 1, 2, 3, ... from its own counter.
+    for module in (record_module, sqlite_module):
+        counter = itertools.count(1)
+        monkeypatch.setattr(module, "uuid4", lambda counter=counter: UUID(int=next(counter)))
+
+    priorities = list(PriorityEnum)
+    for i in range(40):
+        todo = Create(
+            title=f"task {i} {'groceries' if i % 5 == 0 else 'report'}",
+            description="weekly" if i % 3 == 0 else None,
+            due_date=TODAY + timedelta(days=i % 7) if i % 4 else None,
+            priority=priorities[i % len(priorities)]
+        )
+        created = [service.create_todo(todo) for service in (memory, sqlite)]
+        assert created[0]["id"] == created[1]["id"]
+        if i % 3 == 1:
+            for service in (memory, sqlite):
+                service.repo.update(UUID(created[0]["id"]), {"is_completed": True})
+    yield memory, sqlite
+    sqlite_repository.close()
+
+
+def ids_of(page):
+    return [item["id"] for item in page["items"]]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("sort_by", ["created_at", "due_date"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_filter_sort_page_parity(services, filters, sort_by, order):
+    memory, sqlite = services
+    page, total_pages = 1, 1
+    while page <= total_pages:
+        pagination = Pagination(page=page, size=6)
+        expected = memory.list_todos(pagination, filters, sort_by, order)
+        actual = sqlite.list_todos(pagination, filters, sort_by, order)
+        assert actual["total_items"] == expected["total_items"]
+        assert ids_of(actual) == ids_of(expected)
+        total_pages = expected["total_pages"]
+        page += 1
+
+    cursors = {}
+    for name, service in (("memory", memory), ("sqlite", sqlite)):
+        walked, cursor = [], None
+        while True:
+            page = service.list_todos(Pagination(size=5, cursor=cursor), filters, sort_by, order)
+            walked.extend(ids_of(page))
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        cursors[name] = walked
+    assert cursors["sqlite"] == cursors["memory"]
+
+
+def test_stats_parity(services):
+    memory, sqlite = services
+    assert sqlite.get_stats() == memory.get_stats()
+
+
+@pytest.mark.parametrize("query", ["groceries", "report weekly", "gro", "task 1"])
+def test_search_matches_same_todos(services, query):
+    # Both require every term and match terms of two characters or more as
+    # prefixes; they rank differently, so only the matches are compared.
+    memory, sqlite = services
+    expected = memory.search_todos(query, Pagination(size=100))
+    actual = sqlite.search_todos(query, Pagination(size=100))
+    assert actual["total_items"] == expected["total_items"]
+    assert sorted(ids_of(actual)) == sorted(ids_of(expected))
+
+
+def test_outbox_rows_commit_with_the_change():
+    producer = MockEventProducer()
+    repository = SqliteToDoRepo("sqlite://", producer, transactional_outbox=True)
+    service = ToDoService(repository, producer)
+    service.create_todo(Create(title="kept"))
+
+    def crash(connection, event_type, payload):
+        raise RuntimeError("crash before commit")
+    repository._emit = crash
+    with pytest.raises(RuntimeError):
+        service.create_todo(Create(title="rolled back"))
+
+    assert [todo["title"] for todo in repository.get_all()] == ["kept"]
+    messages = repository.outbox.get_messages()
+    assert [message.event_type for message in messages] == ["todo_created"]
+    assert producer.get_events() == []
+
+    sent = []
+    producer.send_events = lambda events, timeout=10.0, event_ids=None: sent.extend(event_ids) or [True] * len(events)
+    assert OutboxRelay(repository.outbox, producer).run_once() == 1
+    assert sent == [messages[0].id]
+    repository.close()
+
+
+
+def test_relay_publishes_outside_the_claim_transaction(tmp_path):
+    producer = MockEventProducer()
+    repository = SqliteToDoRepo(f"sqlite:///{tmp_path / 'todos.db'}", producer, transactional_outbox=True)
+    service = ToDoService(repository, producer)
+    service.create_todo(Create(title="first"))
+
+    outbox = repository.outbox
+    open_sessions = []
+    session_scope = outbox.session_scope
+
+    @contextmanager
+    def tracked_scope():
+        open_sessions.append(None)
+        try:
+            with session_scope() as session:
+                yield session
+        finally:
+            open_sessions.pop()
+    outbox.session_scope = tracked_scope
+
+    def send_events(events, timeout=10.0, event_ids=None):
+        # Broker confirms may take seconds; no outbox transaction may wait on them.
+        assert open_sessions == []
+        service.create_todo(Create(title="written during publish"))
+        return [True] * len(events)
+    producer.send_events = send_events
+
+    assert OutboxRelay(outbox, producer).run_once() == 1
+    assert [message.payload["title"] for message in outbox.get_messages(processed=False)] == ["written during publish"]
+    repository.close()
+
+
+class FlakyCommitConnection(sqlite3.Connection):
+    fail_next_commit = False
+
+    def execute(self, sql, *args):
+        if sql == "COMMIT" and FlakyCommitConnection.fail_next_commit:
+            FlakyCommitConnection.fail_next_commit = False
+            raise sqlite3.OperationalError("database is locked")
+        return super().execute(sql, *args)
+
+
+def test_failed_commit_leaves_the_connection_usable(monkeypatch):
+    monkeypatch.setattr(sqlite_module.sqlite3, "connect", functools.partial(sqlite3.connect, factory=FlakyCommitConnection))
+    producer = MockEventProducer()
+    repository = SqliteToDoRepo("sqlite://", producer)
+    service = ToDoService(repository, producer)
+
+    FlakyCommitConnection.fail_next_commit = True
+    with pytest.raises(sqlite3.OperationalError):
+        service.create_todo(Create(title="lost"))
+    service.create_todo(Create(title="kept"))
+
+    assert [todo["title"] for todo in repository.get_all()] == ["kept"]
+    assert [event["event_type"] for event in producer.get_events()] == ["todo_created"]
+    repository.close()
+
+
+def test_created_at_text_sorts_in_time_order(monkeypatch, tmp_path):
+    moments = iter([datetime(2026, 1, 1, 12, 0, 0), datetime(2026, 1, 1, 12, 0, 0, 1)])
+
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return next(moments)
+    monkeypatch.setattr(sqlite_module, "datetime", Clock)
+
+    url = f"sqlite:///{tmp_path / 'todos.db'}"
+    producer = MockEventProducer()
+    repository = SqliteToDoRepo(url, producer)
+    service = ToDoService(repository, producer)
+    first = service.create_todo(Create(title="on the second"))
+    second = service.create_todo(Create(title="a microsecond later"))
+    assert first["created_at"] == "2026-01-01T12:00:00.000000Z"
+
+    page = service.list_todos(Pagination(size=1), Filter(), "created_at", "asc")
+    assert ids_of(page) == [first["id"]]
+    page = service.list_todos(Pagination(size=1, cursor=page["next_cursor"]), Filter(), "created_at", "asc")
+    assert ids_of(page) == [second["id"]]
+
+    # Rows written before timestamps were fixed width are padded on open.
+    repository._connection().execute("UPDATE todos SET created_at = '2026-01-01T12:00:00Z' WHERE id = ?", (first["id"],))
+    repository.close()
+    reopened = SqliteToDoRepo(url, producer)
+    assert reopened.get_by_id(UUID(first["id"]))["created_at"] == "2026-01-01T12:00:00.000000Z"
+    reopened.close()
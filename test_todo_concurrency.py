@@ -0,0 +1,85 @@
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from uuid import UUID
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'todo_app-2'))
+
+from benchmarks.helpers import NullProducer
+from common.exceptions import FoundError
+from models.enums import PriorityEnum
+from models.todo_models import Create, Filter
+from repositories.todo_index import sort_key
+from repositories.todo_repository import ToDoRepo
+
+THREADS = 6
+OPERATIONS = 300
+
+
+def worker(repo, ids, ids_lock, seed, errors):
+    rng = random.Random(seed)
+    for i in range(OPERATIONS):
+        roll = rng.random()
+        try:
+            if roll < 0.4 or not ids:
+                todo = repo.create(Create(
+                    title=f"alpha {seed} {i}",
+                    due_date=date.today() + timedelta(days=rng.randint(0, 9)) if rng.random() < 0.7 else None,
+                    priority=rng.choice(list(PriorityEnum))
+                ))
+                with ids_lock:
+                    ids.append(UUID(todo["id"]))
+            elif roll < 0.8:
+                with ids_lock:
+                    todo_id = rng.choice(ids)
+                update = {"is_completed": rng.random() < 0.5, "priority": rng.choice(list(PriorityEnum))}
+                if rng.random() < 0.5:
+                    update["title"] = f"beta {seed} {i}"
+                repo.update(todo_id, update)
+            else:
+                with ids_lock:
+                    todo_id = ids.pop(rng.randrange(len(ids))) if ids else None
+                if todo_id is not None:
+                    repo.delete(todo_id)
+        except FoundError:
+            pass  # deleted by another thread in between
+        except Exception as e:
+            errors.append(repr(e))
+
+
+def test_concurrent_writes_keep_indexes_and_stats_consistent():
+    repo = ToDoRepo(NullProducer(), lock_stripes=4)
+    ids, ids_lock, errors = [], threading.Lock(), []
+    threads = [threading.Thread(target=worker, args=(repo, ids, ids_lock, seed, errors)) for seed in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert errors == []
+
+    todos = [record.to_dict() for record in repo._storage.values()]
+    assert {UUID(todo["id"]) for todo in todos} == set(ids)
+    assert len(repo._index) == len(todos)
+    for sort_by in ("created_at", "due_date"):
+        total, items = repo.query(Filter(), sort_by, False, 0, len(todos) + 1)
+        expected = sorted(todos, key=lambda todo: (sort_key(sort_by, todo), UUID(todo["id"])))
+        assert total == len(todos)
+        assert [item["id"] for item in items] == [todo["id"] for todo in expected]
+    for completed in (True, False):
+        total, _ = repo.query(Filter(completed=completed), "created_at", False, 0, 1)
+        assert total == sum(todo["is_completed"] == completed for todo in todos)
+
+    for word in ("alpha", "beta"):
+        total, items = repo.search(word, 0, len(todos) + 1)
+        expected = {todo["id"] for todo in todos if todo["title"].startswith(word)}
+        assert total == len(expected)
+        assert {item["id"] for item in items} == expected
+
+    stats = repo.stats()
+    assert stats["total"] == len(todos)
+    assert stats["completed"] == sum(todo["is_completed"] for todo in todos)
+    priorities = Counter(todo["priority"] for todo in todos)
+    assert {priority: count for priority, count in stats["by_priority"].items() if count} == dict(priorities)
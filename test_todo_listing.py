@@ -0,0 +1,70 @@
+import os
+import sys
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'todo_app-2'))
+
+from common.exceptions import ParameterError
+from events.mock_event_producer import MockEventProducer
+from models.todo_models import Create, Filter, Pagination
+from repositories.todo_repository import ToDoRepo
+from services.todo_service import ToDoService, decode_cursor, encode_cursor
+
+
+def make_service(count=23):
+    # Seven todos per due date plus undated ones, so most sort keys repeat.
+    producer = MockEventProducer()
+    service = ToDoService(ToDoRepo(producer), producer)
+    due_dates = [date.today() + timedelta(days=offset) for offset in (3, 1, 2)] + [None]
+    for i in range(count):
+        service.create_todo(Create(title=f"todo {i}", due_date=due_dates[i % len(due_dates)]))
+    return service
+
+
+def walk_cursor(service, sort_by, order, size):
+    ids, cursor = [], None
+    while True:
+        page = service.list_todos(Pagination(size=size, cursor=cursor), Filter(), sort_by, order)
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_cursor_round_trip():
+    todo_id = uuid4()
+    for sort_by, key in (("due_date", (0, 739000)), ("due_date", (1, 0)), ("created_at", (0, 1760688000123456))):
+        cursor = encode_cursor(sort_by, "desc", (key, todo_id))
+        assert "=" not in cursor
+        assert decode_cursor(cursor, sort_by, "desc") == (key, todo_id)
+
+
+def test_cursor_rejects_other_sort_and_garbage():
+    cursor = encode_cursor("due_date", "asc", ((0, 739000), uuid4()))
+    with pytest.raises(ParameterError):
+        decode_cursor(cursor, "due_date", "desc")
+    with pytest.raises(ParameterError):
+        decode_cursor(cursor, "created_at", "asc")
+    with pytest.raises(ParameterError):
+        decode_cursor("not-a-cursor", "due_date", "asc")
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_pages_cover_duplicate_sort_keys_once(order):
+    service = make_service()
+    everything = service.list_todos(Pagination(size=100), Filter(), "due_date", order)["items"]
+    for size in (1, 4, 7):
+        assert walk_cursor(service, "due_date", order, size) == [item["id"] for item in everything]
+
+
+def test_cursor_walk_matches_page_numbers():
+    service = make_service()
+    by_page = []
+    for page in range(1, 7):
+        by_page.extend(
+            item["id"] for item in service.list_todos(Pagination(page=page, size=4), Filter(), "created_at", "asc")["items"]
+        )
+    assert walk_cursor(service, "created_at", "asc", 4) == by_page
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'todo_app-2'))
+
+from events.unit_of_work import AsyncUnitOfWork, UnitOfWork
+
+
+class RecordingProducer:
+    def __init__(self):
+        self.sent = []
+
+    def send_event(self, event_type, payload, event_id=None):
+        self.sent.append((event_type, payload))
+
+
+class AsyncRecordingProducer:
+    def __init__(self):
+        self.batches = []
+
+    async def send_events(self, events):
+        self.batches.append(list(events))
+
+
+def todo(todo_id, title):
+    return {"id": todo_id, "title": title}
+
+
+def publish(*recorded):
+    producer = RecordingProducer()
+    unit_of_work = UnitOfWork(producer)
+    with unit_of_work.begin():
+        for event_type, payload in recorded:
+            unit_of_work.record(event_type, payload)
+    return producer.sent
+
+
+def test_create_then_update_is_one_create_with_the_final_state():
+    assert publish(
+        ("todo_created", todo("a", "draft")),
+        ("todo_updated", todo("a", "edited")),
+        ("todo_updated", todo("a", "final")),
+    ) == [("todo_created", todo("a", "final"))]
+
+
+def test_create_then_delete_is_nothing():
+    assert publish(
+        ("todo_created", todo("a", "draft")),
+        ("todo_updated", todo("a", "edited")),
+        ("todo_deleted", {"id": "a"}),
+    ) == []
+
+
+def test_update_then_delete_is_a_delete():
+    assert publish(
+        ("todo_updated", todo("a", "edited")),
+        ("todo_deleted", {"id": "a"}),
+    ) == [("todo_deleted", {"id": "a"})]
+
+
+def test_other_todos_keep_their_order():
+    assert publish(
+        ("todo_created", todo("a", "first")),
+        ("todo_updated", todo("b", "second")),
+        ("todo_updated", todo("a", "first, edited")),
+    ) == [("todo_created", todo("a", "first, edited")), ("todo_updated", todo("b", "second"))]
+
+
+def test_nested_units_publish_once_when_the_outermost_exits():
+    producer = RecordingProducer()
+    unit_of_work = UnitOfWork(producer)
+    with unit_of_work.begin() as outer:
+        with unit_of_work.begin() as inner:
+            assert inner is outer
+            unit_of_work.record("todo_created", todo("a", "draft"))
+        assert producer.sent == []
+        with unit_of_work.begin():
+            unit_of_work.record("todo_updated", todo("a", "final"))
+        assert producer.sent == []
+    assert producer.sent == [("todo_created", todo("a", "final"))]
+
+
+def test_a_failed_unit_publishes_nothing():
+    producer = RecordingProducer()
+    unit_of_work = UnitOfWork(producer)
+    with pytest.raises(ValueError):
+        with unit_of_work.begin():
+            unit_of_work.record("todo_created", todo("a", "draft"))
+            raise ValueError("rolled back")
+    assert producer.sent == []
+
+
+def test_events_outside_a_unit_are_published_right_away():
+    producer = RecordingProducer()
+    UnitOfWork(producer).record("todo_created", todo("a", "draft"))
+    assert producer.sent == [("todo_created", todo("a", "draft"))]
+
+
+def test_async_record_outside_begin_async_raises():
+    producer = AsyncRecordingProducer()
+    with pytest.raises(RuntimeError):
+        AsyncUnitOfWork(producer).record("todo_created", todo("a", "draft"))
+    assert producer.batches == []
+
+
+def test_async_unit_collects_from_worker_threads():
+    producer = AsyncRecordingProducer()
+    unit_of_work = AsyncUnitOfWork(producer)
+
+    async def run():
+        async with unit_of_work.begin_async():
+            await asyncio.to_thread(unit_of_work.record, "todo_created", todo("a", "draft"))
+            with unit_of_work.begin():
+                unit_of_work.record("todo_updated", todo("a", "final"))
+            assert producer.batches == []
+
+    asyncio.run(run())
+    assert producer.batches == [[("todo_created", todo("a", "final"))]]
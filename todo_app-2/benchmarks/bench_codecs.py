@@ -0,0 +1,70 @@
+"""
+Compare event codecs: encoded size and encode/decode time per event.
+
+    python benchmarks/bench_codecs.py --events 20000 --description-size 2000
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, date
+from uuid import uuid4
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from events.event_codecs import EventSerializer, msgpack
+from events.event_models import new_event_id
+
+
+def make_event(description_size: int) -> dict:
+    payload = {
+        "id": str(uuid4()),
+        "title": "Prepare the quarterly report",
+        "description": ("Collect numbers from every team. " * (description_size // 33 + 1))[:description_size],
+        "is_completed": False,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "due_date": date.today().isoformat(),
+        "priority": "high"
+    }
+    return {
+        "event_id": new_event_id(),
+        "event_type": "todo_updated",
+        "payload": payload,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--description-size", type=int, default=200)
+    parser.add_argument("--threshold", type=int, default=1024, help="compression threshold in bytes")
+    args = parser.parse_args()
+
+    events = [make_event(args.description_size) for _ in range(1000)]
+    candidates = [("json", 0), ("json", args.threshold)]
+    if msgpack is not None:
+        candidates += [("msgpack", 0), ("msgpack", args.threshold)]
+    else:
+        print("msgpack is not installed, skipping it")
+
+    print(f"{'codec':<10}{'deflate':>9}{'bytes/event':>14}{'encode us':>12}{'decode us':>12}")
+    for codec, threshold in candidates:
+        serializer = EventSerializer(codec, compress_threshold=threshold)
+        encoded = [serializer.dumps(event) for event in events]
+        size = sum(len(body) for body, _, _ in encoded) / len(encoded)
+        rounds = max(1, args.events // len(events))
+
+        encode_time = timeit.timeit(lambda: [serializer.dumps(event) for event in events], number=rounds)
+        decode_time = timeit.timeit(
+            lambda: [serializer.loads(body, content_type, encoding) for body, content_type, encoding in encoded],
+            number=rounds
+        )
+        per_event = 1e6 / (rounds * len(events))
+        print(
+            f"{codec:<10}{'>' + str(threshold) if threshold else 'off':>9}{size:>14.0f}"
+            f"{encode_time * per_event:>12.2f}{decode_time * per_event:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
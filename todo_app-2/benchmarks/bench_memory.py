@@ -0,0 +1,85 @@
+"""
+Bytes per stored todo: the old dict-per-item layout against TodoRecord.
+
+    python benchmarks/bench_memory.py --todos 200000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.enums import PriorityEnum
+from repositories.todo_index import TodoIndex
+from repositories.todo_record import TodoRecord
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--todos", type=int, default=200000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    # Titles and descriptions are shared by both layouts so only the
+    # per-item overhead is compared.
+    titles = [f"Task number {i}" for i in range(args.todos)]
+    descriptions = [None if i % 3 else f"Details for task {i}" for i in range(args.todos)]
+    due_dates = [date.today() + timedelta(days=random.randint(0, 365)) if i % 4 else None for i in range(args.todos)]
+    priorities = [random.choice(list(PriorityEnum)) for _ in range(args.todos)]
+
+    def build_dicts():
+        storage = {}
+        for i in range(args.todos):
+            todo_id = uuid4()
+            storage[todo_id] = {
+                "id": str(todo_id),
+                "title": titles[i],
+                "description": descriptions[i],
+                "is_completed": False,
+                "created_at": datetime.utcnow().isoformat() + "Z",
+                "due_date": due_dates[i].isoformat() if due_dates[i] else None,
+                "priority": priorities[i].value
+            }
+        return storage
+
+    def build_records():
+        storage = {}
+        for i in range(args.todos):
+            record = TodoRecord.new(titles[i], descriptions[i], due_dates[i], priorities[i])
+            storage[record.id] = record
+        return storage
+
+    def build_records_with_index():
+        storage = build_records()
+        index = TodoIndex()
+        for record in storage.values():
+            index.add(record)
+        return storage, index
+
+    results = [
+        ("dict per todo", measure(build_dicts)),
+        ("TodoRecord", measure(build_records)),
+        ("TodoRecord + TodoIndex", measure(build_records_with_index)),
+    ]
+    print(f"{'layout':<26}{'bytes/todo':>12}")
+    for name, total in results:
+        print(f"{name:<26}{total / args.todos:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Cost of serving GET /api/todos?size=100 before and after ORJSONResponse.
+
+"before" is the old route: response_model=Dict[str, Any], so FastAPI
+validates and re-encodes the page before JSONResponse dumps it.
+"after" returns the service dict as an ORJSONResponse, as the routers do now.
+
+    python benchmarks/bench_responses.py --todos 1000 --size 100 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import timeit
+from datetime import date, timedelta
+from typing import Any, Dict
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.helpers import NullProducer
+from models.enums import PriorityEnum
+from models.todo_models import Create, Filter, Pagination, TodoPage
+from repositories.todo_repository import ToDoRepo
+from services.todo_service import ToDoService
+
+
+def make_service(todos: int) -> ToDoService:
+    producer = NullProducer()
+    service = ToDoService(ToDoRepo(producer), producer)
+    priorities = list(PriorityEnum)
+    for i in range(todos):
+        service.create_todo(Create(
+            title=f"Task {i}",
+            description="Collect numbers from every team and write them up.",
+            due_date=date.today() + timedelta(days=i % 30),
+            priority=priorities[i % len(priorities)]
+        ))
+    return service
+
+
+def make_app(service: ToDoService) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before", response_model=Dict[str, Any])
+    def before(page: int = Query(1), size: int = Query(10)):
+        return service.list_todos(Pagination(page=page, size=size), Filter())
+
+    @app.get("/after", response_model=TodoPage, response_class=ORJSONResponse)
+    def after(page: int = Query(1), size: int = Query(10)):
+        return ORJSONResponse(service.list_todos(Pagination(page=page, size=size), Filter()))
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--todos", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    service = make_service(args.todos)
+    result = service.list_todos(Pagination(page=1, size=args.size), Filter())
+
+    app = make_app(service)
+    before_route = next(route for route in app.routes if getattr(route, "path", None) == "/before")
+
+    loop = asyncio.new_event_loop()
+
+    def before_render():
+        content = loop.run_until_complete(serialize_response(field=before_route.response_field, response_content=result))
+        return JSONResponse(content).body
+
+    print(f"serialization only, one page of {args.size} todos:")
+    runs = 1000
+    seconds = timeit.timeit(before_render, number=runs)
+    print(f"  response_model + JSONResponse  {seconds / runs * 1e6:8.1f} us")
+    seconds = timeit.timeit(lambda: ORJSONResponse(result).body, number=runs)
+    print(f"  ORJSONResponse                 {seconds / runs * 1e6:8.1f} us")
+
+    client = TestClient(app)
+    print(f"GET ?size={args.size}, {args.requests} requests through the app:")
+    for path in ("/before", "/after"):
+        url = f"{path}?size={args.size}"
+        assert client.get(url).json() == json.loads(json.dumps(result))
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            client.get(url)
+        elapsed = time.perf_counter() - started
+        print(f"  {path:8} {elapsed / args.requests * 1e3:8.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
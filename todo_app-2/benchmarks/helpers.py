@@ -0,0 +1,18 @@
+"""
+Pieces shared by the benchmarks.
+"""
+import time
+
+from events.mock_event_producer import MockEventProducer
+
+
+class NullProducer(MockEventProducer):
+    """Drops every event, after blocking for publish_delay seconds like a slow broker."""
+
+    def __init__(self, publish_delay: float = 0.0):
+        super().__init__()
+        self.publish_delay = publish_delay
+
+    def send_event(self, event_type, payload, event_id=None):
+        if self.publish_delay:
+            time.sleep(self.publish_delay)
@@ -0,0 +1,128 @@
+"""
+Hammer ToDoRepo from many threads and check its invariants afterwards.
+
+    python benchmarks/stress_repository.py --threads 16 --seconds 5
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from uuid import UUID
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.helpers import NullProducer
+from common.exceptions import FoundError
+from models.enums import PriorityEnum
+from models.todo_models import Create, Filter
+from repositories.todo_index import sort_key
+from repositories.todo_repository import ToDoRepo
+
+
+def worker(repo: ToDoRepo, ids: list, ids_lock: threading.Lock, deadline: float, seed: int, counts: dict, errors: list):
+    rng = random.Random(seed)
+    done = 0
+    while time.monotonic() < deadline:
+        roll = rng.random()
+        try:
+            if roll < 0.25 or not ids:
+                todo = repo.create(Create(
+                    title=f"task {rng.randint(0, 1000)}",
+                    due_date=date.today() + timedelta(days=rng.randint(0, 60)) if rng.random() < 0.7 else None,
+                    priority=rng.choice(list(PriorityEnum))
+                ))
+                with ids_lock:
+                    ids.append(UUID(todo["id"]))
+            elif roll < 0.55:
+                with ids_lock:
+                    todo_id = rng.choice(ids)
+                repo.update(todo_id, {
+                    "is_completed": rng.random() < 0.5,
+                    "priority": rng.choice(list(PriorityEnum)),
+                    "due_date": date.today() + timedelta(days=rng.randint(0, 60))
+                })
+            elif roll < 0.65:
+                with ids_lock:
+                    todo_id = ids.pop(rng.randrange(len(ids))) if ids else None
+                if todo_id is not None:
+                    repo.delete(todo_id)
+            else:
+                sort_by = rng.choice(["created_at", "due_date"])
+                descending = rng.random() < 0.5
+                filters = Filter(completed=rng.choice([None, True, False]))
+                total, items = repo.query(filters, sort_by, descending, 0, 50)
+                keys = [(sort_key(sort_by, todo), UUID(todo["id"])) for todo in items]
+                if keys != sorted(keys, reverse=descending):
+                    errors.append(f"page out of order for {sort_by}")
+                if len(items) > total or len({todo["id"] for todo in items}) != len(items):
+                    errors.append("page inconsistent with its total")
+                if filters.completed is not None and any(todo["is_completed"] != filters.completed for todo in items):
+                    errors.append("page does not match its filter")
+        except FoundError:
+            pass  # another thread deleted it first
+        except Exception as e:
+            errors.append(repr(e))
+        done += 1
+    counts[seed] = done
+
+
+def check_final_state(repo: ToDoRepo, expected_ids: set) -> list:
+    problems = []
+    todos = repo.get_all()
+    stored = {UUID(todo["id"]) for todo in todos}
+    if stored != expected_ids:
+        problems.append(f"storage has {len(stored)} todos, expected {len(expected_ids)}")
+    if len(repo._index) != len(todos):
+        problems.append(f"index has {len(repo._index)} entries for {len(todos)} todos")
+    for sort_by in ("created_at", "due_date"):
+        total, items = repo.query(Filter(), sort_by, False, 0, len(todos) + 1)
+        expected = sorted(todos, key=lambda todo: (sort_key(sort_by, todo), UUID(todo["id"])))
+        if total != len(todos) or [t["id"] for t in items] != [t["id"] for t in expected]:
+            problems.append(f"{sort_by} index disagrees with storage")
+    for completed in (True, False):
+        total, _ = repo.query(Filter(completed=completed), "created_at", False, 0, 1)
+        if total != sum(1 for todo in todos if todo["is_completed"] == completed):
+            problems.append(f"completed={completed} bucket has the wrong size")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    repo = ToDoRepo(NullProducer())
+    ids: list = []
+    ids_lock = threading.Lock()
+    counts: dict = {}
+    errors: list = []
+    deadline = time.monotonic() + args.seconds
+
+    threads = [
+        threading.Thread(target=worker, args=(repo, ids, ids_lock, deadline, seed, counts, errors))
+        for seed in range(args.threads)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    problems = errors[:10] + check_final_state(repo, set(ids))
+    operations = sum(counts.values())
+    print(f"{operations} operations in {elapsed:.1f}s ({operations / elapsed:.0f} ops/s) on {args.threads} threads")
+    print(f"{len(repo.get_all())} todos left")
+    if problems:
+        print("FAILED:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("all invariants hold")
+
+
+if __name__ == "__main__":
+    main()
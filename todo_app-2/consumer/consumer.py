@@ -1,10 +1,13 @@
 import pika
-import json
 import os
 import logging
 from dotenv import load_dotenv
 from jaeger_client import Config
 import opentracing
+from worker_pool import AckTracker, ShardedWorkerPool
+from retry import RetryRouter, parse_delays
+from event_codecs import decode_delivery
+from dedup import DedupCache, Deduplicator, SqliteDedupWindow
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,31 +29,153 @@ def init_tracer():
     )
     return config.initialize_tracer()
 
+def handle_message(message, span):
+    logger.info(f"Received message: {message}")
+    span.set_tag('message', message)
+
+def event_id_of(message, properties):
+    if properties is not None and properties.message_id:
+        return properties.message_id
+    return message.get('event_id') if isinstance(message, dict) else None
+
+def is_duplicate(message, properties, span) -> bool:
+    if deduplicator.is_duplicate(event_id_of(message, properties)):
+        logger.info(f"Skipping duplicate event {event_id_of(message, properties)}")
+        span.set_tag('duplicate', True)
+        return True
+    return False
+
+def route_failure(ch, properties, body, error) -> bool:
+    """Hand a failed message to its retry tier; False if it has to stay on the queue."""
+    try:
+        retry_router.route_failure(ch, properties, body, error)
+        return True
+    except Exception as e:
+        logger.error(f"Could not move failed message to a retry queue: {e}")
+        return False
+
 def process_message(ch, method, properties, body):
     with tracer.start_span('process_message') as span:
         try:
-            message = json.loads(body)
-            logger.info(f"Received message: {message}")
-            span.set_tag('message', message)
+            message = decode_delivery(properties, body)
+            if not is_duplicate(message, properties, span):
+                handle_message(message, span)
+                deduplicator.mark_processed(event_id_of(message, properties))
             ch.basic_ack(delivery_tag=method.delivery_tag)
         except Exception as e:
             logger.error(f"Error processing message: {e}")
             span.set_tag('error', str(e))
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            if route_failure(ch, properties, body, e):
+                ch.basic_ack(delivery_tag=method.delivery_tag)
+            else:
+                ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+
+def process_in_worker(delivery):
+    message, properties, _body = delivery
+    with tracer.start_span('process_message') as span:
+        # Duplicates share the todo id, so they land on this same worker in order.
+        if is_duplicate(message, properties, span):
+            return
+        try:
+            handle_message(message, span)
+            deduplicator.mark_processed(event_id_of(message, properties))
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+            span.set_tag('error', str(e))
+            raise
+
+def ordering_key(message, method) -> str:
+    payload = message.get('payload') if isinstance(message, dict) else None
+    if isinstance(payload, dict) and payload.get('id'):
+        return str(payload['id'])
+    return str(method.delivery_tag)
+
+def start_pool_consumer(connection, channel, queue_name):
+    """Dispatch deliveries to worker threads; acks stay on the I/O thread."""
+    workers = int(os.getenv('CONSUMER_WORKERS', str(os.cpu_count() or 4)))
+    ack_tracker = AckTracker(channel, batch_size=int(os.getenv('CONSUMER_ACK_BATCH', '50')))
+    ack_interval = float(os.getenv('CONSUMER_ACK_INTERVAL', '0.5'))
+
+    def finish(delivery_tag, error, delivery):
+        if error is None:
+            ack_tracker.complete(delivery_tag, True)
+            return
+        _message, properties, body = delivery
+        if route_failure(channel, properties, body, error):
+            ack_tracker.complete(delivery_tag, True)
+        else:
+            ack_tracker.complete(delivery_tag, False, requeue=True)
+
+    def on_done(delivery_tag, error, delivery):
+        connection.add_callback_threadsafe(lambda: finish(delivery_tag, error, delivery))
+
+    pool = ShardedWorkerPool(workers, process_in_worker, on_done)
+
+    def on_message(ch, method, properties, body):
+        try:
+            message = decode_delivery(properties, body)
+        except ValueError as e:
+            logger.error(f"Error decoding message: {e}")
+            ack_tracker.track(method.delivery_tag)
+            finish(method.delivery_tag, e, (None, properties, body))
+            return
+        ack_tracker.track(method.delivery_tag)
+        pool.submit(ordering_key(message, method), method.delivery_tag, (message, properties, body))
+
+    def flush_acks():
+        # Bounds how long a finished message can sit unacked on a quiet queue.
+        ack_tracker.flush()
+        connection.call_later(ack_interval, flush_acks)
+
+    channel.basic_consume(queue=queue_name, on_message_callback=on_message)
+    connection.call_later(ack_interval, flush_acks)
+    logger.info(f'Consumer started with {workers} workers. Waiting for messages...')
+    try:
+        channel.start_consuming()
+    finally:
+        pool.stop()
+
+def init_deduplicator():
+    cache = DedupCache(
+        max_entries=int(os.getenv('DEDUP_MAX_ENTRIES', '100000')),
+        ttl=float(os.getenv('DEDUP_TTL', '60'))
+    )
+    window = None
+    if os.getenv('DEDUP_SQLITE_PATH'):
+        window = SqliteDedupWindow(
+            os.getenv('DEDUP_SQLITE_PATH'),
+            window=float(os.getenv('DEDUP_WINDOW', '3600'))
+        )
+    return Deduplicator(cache, window)
 
 def main():
-    global tracer
+    global tracer, retry_router, deduplicator
     tracer = init_tracer()
+    deduplicator = init_deduplicator()
 
     rabbitmq_url = os.getenv('RABBITMQ_URL')
     queue_name = os.getenv('TODO_QUEUE')
+    mode = os.getenv('CONSUMER_MODE', 'serial')
+    retry_router = RetryRouter(
+        queue_name,
+        os.getenv('DEAD_LETTER_QUEUE', 'dead_letter_queue'),
+        parse_delays(os.getenv('RETRY_DELAYS', '1,10,60'))
+    )
 
     connection = pika.BlockingConnection(pika.URLParameters(rabbitmq_url))
     channel = connection.channel()
 
     channel.queue_declare(queue=queue_name, durable=True)
+    retry_router.declare(channel)
+    # Retry republishes must be confirmed before the original is acked.
+    channel.confirm_delivery()
+
+    if mode == 'pool':
+        channel.basic_qos(prefetch_count=int(os.getenv('CONSUMER_PREFETCH', '200')))
+        start_pool_consumer(connection, channel, queue_name)
+        return
 
-    channel.basic_qos(prefetch_count=1)
+    channel.basic_qos(prefetch_count=int(os.getenv('CONSUMER_PREFETCH', '1')))
     channel.basic_consume(queue=queue_name, on_message_callback=process_message)
     logger.info('Consumer started. Waiting for messages...')
     channel.start_consuming()
@@ -0,0 +1,125 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DedupCache:
+    """Bounded set of recently processed event ids.
+
+    An ``OrderedDict`` kept in insertion order doubles as LRU and expiry
+    queue: lookups and inserts are O(1), and the oldest entries are
+    dropped once ``max_entries`` is reached or ``ttl`` has passed.
+    """
+
+    def __init__(self, max_entries: int = 100000, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def contains(self, event_id: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            expires_at = self._seen.get(event_id)
+            if expires_at is None:
+                return False
+            if expires_at <= now:
+                del self._seen[event_id]
+                return False
+            return True
+
+    def add(self, event_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._seen.pop(event_id, None)
+            self._seen[event_id] = now + self.ttl
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        while self._seen:
+            event_id, expires_at = next(iter(self._seen.items()))
+            if len(self._seen) <= self.max_entries and expires_at > now:
+                return
+            del self._seen[event_id]
+
+
+class SqliteDedupWindow:
+    """Event ids seen in the last ``window`` seconds, kept in SQLite.
+
+    Survives consumer restarts and can be shared by consumers on one host.
+    Old ids are pruned every ``prune_every`` inserts.
+    """
+
+    def __init__(self, path: str, window: float = 3600.0, prune_every: int = 1000):
+        self.window = window
+        self.prune_every = prune_every
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed_events (event_id TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_processed_events_seen_at ON processed_events (seen_at)")
+
+    def contains(self, event_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seen_at FROM processed_events WHERE event_id = ?", (event_id,)
+            ).fetchone()
+        return row is not None and row[0] > time.time() - self.window
+
+    def add(self, event_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO processed_events (event_id, seen_at) VALUES (?, ?)",
+                (event_id, time.time())
+            )
+            self._inserts += 1
+            if self._inserts % self.prune_every == 0:
+                self._conn.execute("DELETE FROM processed_events WHERE seen_at < ?", (time.time() - self.window,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class Deduplicator:
+    """Drops events whose id was already processed.
+
+    Ids are only recorded after a message was handled successfully, so a
+    failed message that comes back from a retry tier is processed again.
+    The in-memory cache answers first; the SQLite window, when configured,
+    catches duplicates the cache has already forgotten.
+    """
+
+    def __init__(self, cache: DedupCache, window: Optional[SqliteDedupWindow] = None):
+        self.cache = cache
+        self.window = window
+
+    def is_duplicate(self, event_id: Optional[str]) -> bool:
+        if not event_id:
+            return False
+        if self.cache.contains(event_id):
+            return True
+        if self.window is not None and self.window.contains(event_id):
+            self.cache.add(event_id)
+            return True
+        return False
+
+    def mark_processed(self, event_id: Optional[str]) -> None:
+        if not event_id:
+            return
+        self.cache.add(event_id)
+        if self.window is not None:
+            try:
+                self.window.add(event_id)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not record event {event_id} in the dedup window: {e}")
@@ -0,0 +1,37 @@
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+DEFLATE_ENCODING = 'deflate'
+
+
+def decode_body(body: bytes, content_type: Optional[str] = None, content_encoding: Optional[str] = None) -> Dict[str, Any]:
+    """Decode a message according to its AMQP content_type and content_encoding.
+
+    Messages without a content type predate the codec layer and are JSON.
+    """
+    if content_encoding == DEFLATE_ENCODING:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error as e:
+            raise ValueError(f'Corrupt deflate body: {e}')
+    if content_type in (None, '', JSON_CONTENT_TYPE):
+        return json.loads(body)
+    if content_type == MSGPACK_CONTENT_TYPE:
+        if msgpack is None:
+            raise ValueError('Received a msgpack message but msgpack is not installed')
+        return msgpack.unpackb(body, raw=False)
+    raise ValueError(f'Unsupported content type: {content_type}')
+
+
+def decode_delivery(properties, body: bytes) -> Dict[str, Any]:
+    if properties is None:
+        return decode_body(body)
+    return decode_body(body, properties.content_type, properties.content_encoding)
@@ -0,0 +1,78 @@
+"""
+Re-inject messages from the dead letter queue into the work queue.
+
+    python replay_dlq.py --limit 1000 --batch 100
+"""
+import argparse
+import logging
+import os
+
+import pika
+from dotenv import load_dotenv
+
+from retry import RETRY_COUNT_HEADER, LAST_ERROR_HEADER
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+
+def replay(channel, dead_letter_queue: str, target_queue: str, limit: int, batch: int) -> int:
+    """Move up to ``limit`` messages, acking the DLQ once per ``batch``."""
+    channel.confirm_delivery()
+    replayed = 0
+    last_tag = None
+    while replayed < limit:
+        method, properties, body = channel.basic_get(queue=dead_letter_queue, auto_ack=False)
+        if method is None:
+            break
+        headers = dict(properties.headers or {})
+        headers.pop(RETRY_COUNT_HEADER, None)
+        headers.pop(LAST_ERROR_HEADER, None)
+        headers['x-replayed'] = True
+        # With confirms on, this returns only once the broker has the copy.
+        channel.basic_publish(
+            exchange='',
+            routing_key=target_queue,
+            body=body,
+            properties=pika.BasicProperties(
+                delivery_mode=2,
+                content_type=properties.content_type,
+                content_encoding=properties.content_encoding,
+                correlation_id=properties.correlation_id,
+                message_id=properties.message_id,
+                headers=headers
+            )
+        )
+        last_tag = method.delivery_tag
+        replayed += 1
+        if replayed % batch == 0:
+            channel.basic_ack(delivery_tag=last_tag, multiple=True)
+            last_tag = None
+            logger.info(f"Replayed {replayed} messages")
+    if last_tag is not None:
+        channel.basic_ack(delivery_tag=last_tag, multiple=True)
+    return replayed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--limit', type=int, default=10000, help='maximum number of messages to replay')
+    parser.add_argument('--batch', type=int, default=100, help='messages per DLQ acknowledgement')
+    parser.add_argument('--target', default=os.getenv('TODO_QUEUE'), help='queue to re-inject into')
+    args = parser.parse_args()
+
+    dead_letter_queue = os.getenv('DEAD_LETTER_QUEUE', 'dead_letter_queue')
+    connection = pika.BlockingConnection(pika.URLParameters(os.getenv('RABBITMQ_URL')))
+    try:
+        channel = connection.channel()
+        channel.queue_declare(queue=dead_letter_queue, durable=True)
+        count = replay(channel, dead_letter_queue, args.target, args.limit, args.batch)
+        logger.info(f"Replayed {count} messages from {dead_letter_queue} to {args.target}")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import logging
+from typing import List, Optional
+
+import pika
+
+logger = logging.getLogger(__name__)
+
+RETRY_COUNT_HEADER = 'x-retry-count'
+LAST_ERROR_HEADER = 'x-last-error'
+
+
+def parse_delays(raw: str) -> List[float]:
+    return [float(part) for part in raw.split(',') if part.strip()]
+
+
+class RetryRouter:
+    """Moves failed messages through delayed retry queues into the DLQ.
+
+    Every delay gets its own queue with a message TTL and a dead-letter
+    route back to the work queue. A failed message is republished to the
+    tier matching its retry count. It sits there, without being consumed,
+    until the TTL expires and the broker hands it back to the work queue.
+    After the last tier it goes to the dead letter queue. Nothing sleeps
+    and nothing is requeued in a tight loop.
+    """
+
+    def __init__(self, queue_name: str, dead_letter_queue: str, delays: List[float]):
+        self.queue_name = queue_name
+        self.dead_letter_queue = dead_letter_queue
+        self.delays = delays
+
+    def tier_queue(self, tier: int) -> str:
+        return f"{self.queue_name}.retry.{int(self.delays[tier] * 1000)}ms"
+
+    def declare(self, channel) -> None:
+        channel.queue_declare(queue=self.dead_letter_queue, durable=True)
+        for tier, delay in enumerate(self.delays):
+            channel.queue_declare(
+                queue=self.tier_queue(tier),
+                durable=True,
+                arguments={
+                    'x-message-ttl': int(delay * 1000),
+                    'x-dead-letter-exchange': '',
+                    'x-dead-letter-routing-key': self.queue_name,
+                }
+            )
+
+    def route_failure(self, channel, properties: Optional[pika.BasicProperties], body: bytes, error: Exception) -> str:
+        """Republish a failed delivery to its next tier; the caller then acks the original."""
+        headers = dict((properties.headers if properties else None) or {})
+        attempt = int(headers.get(RETRY_COUNT_HEADER, 0))
+        if attempt < len(self.delays):
+            target = self.tier_queue(attempt)
+        else:
+            target = self.dead_letter_queue
+        headers[RETRY_COUNT_HEADER] = attempt + 1
+        headers[LAST_ERROR_HEADER] = str(error)[:500]
+
+        channel.basic_publish(
+            exchange='',
+            routing_key=target,
+            body=body,
+            properties=pika.BasicProperties(
+                delivery_mode=2,
+                content_type=properties.content_type if properties else None,
+                content_encoding=properties.content_encoding if properties else None,
+                correlation_id=properties.correlation_id if properties else None,
+                message_id=properties.message_id if properties else None,
+                headers=headers
+            )
+        )
+        logger.warning(f"Message failed (attempt {attempt + 1}), moved to {target}: {error}")
+        return target
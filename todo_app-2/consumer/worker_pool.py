@@ -0,0 +1,109 @@
+import logging
+import queue
+import threading
+import zlib
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class AckTracker:
+    """Acknowledges deliveries in contiguous runs with ``multiple=True``.
+
+    Workers finish messages out of order, but a multi-ack covers every
+    delivery tag up to the one given. So only the prefix of tags that are
+    all finished is acked. A crash therefore redelivers whatever was not
+    finished, and nothing that was. Must only be used on the connection's
+    I/O thread.
+    """
+
+    def __init__(self, channel, batch_size: int = 50):
+        self.channel = channel
+        self.batch_size = batch_size
+        self._pending: Deque[int] = deque()
+        self._finished: Set[int] = set()
+        self._rejected: Set[int] = set()
+        self._ready_tag: Optional[int] = None
+        self._ready_count = 0
+
+    def track(self, delivery_tag: int) -> None:
+        self._pending.append(delivery_tag)
+
+    def complete(self, delivery_tag: int, success: bool, requeue: bool = False) -> None:
+        if not success:
+            # Settled on its own; the ack run then skips over it.
+            self.channel.basic_nack(delivery_tag=delivery_tag, requeue=requeue)
+            self._rejected.add(delivery_tag)
+        self._finished.add(delivery_tag)
+
+        while self._pending and self._pending[0] in self._finished:
+            tag = self._pending.popleft()
+            self._finished.discard(tag)
+            if tag in self._rejected:
+                self._rejected.discard(tag)
+                continue
+            self._ready_tag = tag
+            self._ready_count += 1
+
+        if self._ready_count >= self.batch_size or not self._pending:
+            self._flush()
+
+    def flush(self) -> None:
+        self._flush()
+
+    def _flush(self) -> None:
+        if self._ready_tag is None:
+            return
+        self.channel.basic_ack(delivery_tag=self._ready_tag, multiple=True)
+        self._ready_tag = None
+        self._ready_count = 0
+
+
+class ShardedWorkerPool:
+    """Worker threads that process messages for the same key in order.
+
+    Each key (the todo id) is hashed to one worker with its own queue, so
+    events for one todo are handled sequentially while different todos
+    are processed in parallel.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        handler: Callable[[Any], None],
+        on_done: Callable[[int, Optional[Exception], Any], None]
+    ):
+        self.handler = handler
+        self.on_done = on_done
+        self._queues: List["queue.Queue"] = [queue.Queue() for _ in range(workers)]
+        self._threads = [
+            threading.Thread(target=self._work, args=(q,), name=f"consumer-worker-{i}", daemon=True)
+            for i, q in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key: str, delivery_tag: int, message: Any) -> None:
+        # crc32 rather than hash() so the shard is stable across restarts.
+        shard = zlib.crc32(key.encode()) % len(self._queues)
+        self._queues[shard].put((delivery_tag, message))
+
+    def stop(self, timeout: float = 5.0) -> None:
+        for q in self._queues:
+            q.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _work(self, work_queue: "queue.Queue") -> None:
+        while True:
+            item = work_queue.get()
+            if item is None:
+                return
+            delivery_tag, message = item
+            error: Optional[Exception] = None
+            try:
+                self.handler(message)
+            except Exception as e:
+                error = e
+            self.on_done(delivery_tag, error, message)
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from common.exceptions import EventError
+from events.event_producer import EventProducer
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEventProducer:
+    """Event producer for ``async def`` handlers.
+
+    Publishing only appends to the BatchPublisher buffer; the broker round
+    trip happens on the publisher's own thread and the handler awaits the
+    confirm as an asyncio future, so no event loop or threadpool thread
+    is held while RabbitMQ answers. When the buffer is full the publish
+    fails immediately instead of blocking the loop.
+    """
+
+    def __init__(self, producer: Optional[EventProducer] = None, confirm_timeout: float = 10.0):
+        self.producer = producer or EventProducer()
+        self.confirm_timeout = confirm_timeout
+        # One publisher, and so one broker connection, for the sync and
+        # async paths alike.
+        self.publisher = self.producer.batch_publisher()
+
+    async def send_event(self, event_type: str, payload: Dict[str, Any]) -> None:
+        await self.send_events([(event_type, payload)])
+
+    async def send_events(self, events: List[Tuple[str, Dict[str, Any]]]) -> None:
+        futures = []
+        for event_type, payload in events:
+            body, properties = self.producer._encode(event_type, payload)
+            publish = self.publisher.publish(body, properties=properties, enqueue_timeout=0)
+            futures.append(asyncio.wrap_future(publish))
+        # asyncio.wait leaves unfinished futures alone on timeout; cancelling
+        # them would cancel the publisher's futures while the broker may
+        # still confirm those messages.
+        done, pending = await asyncio.wait(futures, timeout=self.confirm_timeout)
+        errors = [future.exception() for future in done if future.exception() is not None]
+        if errors:
+            raise errors[0]
+        if pending:
+            raise EventError(detail="RabbitMQ did not confirm the events in time")
+
+    def close(self) -> None:
+        self.producer.close()
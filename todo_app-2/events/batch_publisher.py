@@ -0,0 +1,284 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Deque, Optional, Union
+
+import pika
+from pika.exceptions import AMQPError
+from pika.spec import Basic
+
+from common.exceptions import EventError
+
+logger = logging.getLogger(__name__)
+
+
+class PendingMessage:
+    __slots__ = ("routing_key", "body", "properties", "future", "attempts")
+
+    def __init__(self, routing_key: str, body: Union[str, bytes], properties: pika.BasicProperties):
+        self.routing_key = routing_key
+        self.body = body
+        self.properties = properties
+        self.future: Future = Future()
+        self.attempts = 0
+
+
+class BatchPublisher:
+    """Publishes events from a background thread with publisher confirms.
+
+    ``publish`` only appends to an in-process buffer and returns a Future,
+    so the caller never waits for the broker. A dedicated thread owns a
+    SelectConnection, drains the buffer in batches of ``batch_size`` (or
+    every ``flush_interval`` seconds) and resolves each Future when the
+    broker acks it. Nacked messages are retried up to ``max_attempts``;
+    messages in flight when the connection drops are published again after
+    reconnecting, so delivery is at-least-once.
+
+    ``max_buffer`` bounds queued plus unconfirmed messages. When it is
+    reached, ``publish`` blocks for up to ``enqueue_timeout`` seconds and
+    then raises EventError.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        queue_name: str,
+        max_buffer: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        enqueue_timeout: float = 1.0,
+        max_attempts: int = 3,
+        reconnect_delay: float = 1.0
+    ):
+        self.url = url
+        self.queue_name = queue_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_attempts = max_attempts
+        self.reconnect_delay = reconnect_delay
+
+        self._slots = threading.BoundedSemaphore(max_buffer)
+        self._buffer: Deque[PendingMessage] = deque()
+        self._unconfirmed: "OrderedDict[int, PendingMessage]" = OrderedDict()
+        self._outstanding = 0
+        self._state = threading.Condition()
+
+        self._connection: Optional[pika.SelectConnection] = None
+        self._channel = None
+        self._delivery_tag = 0
+        self._ready = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._state:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="event-batch-publisher", daemon=True)
+            self._thread.start()
+
+    def publish(
+        self,
+        body: Union[str, bytes],
+        properties: Optional[pika.BasicProperties] = None,
+        routing_key: Optional[str] = None,
+        enqueue_timeout: Optional[float] = None
+    ) -> Future:
+        """Buffer a message; ``enqueue_timeout`` overrides the instance default."""
+        if self._stopping:
+            raise EventError(detail="Event publisher is stopped")
+        timeout = self.enqueue_timeout if enqueue_timeout is None else enqueue_timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise EventError(detail="Event buffer is full, RabbitMQ is not keeping up")
+
+        message = PendingMessage(
+            routing_key or self.queue_name,
+            body,
+            properties or pika.BasicProperties(delivery_mode=2)
+        )
+        with self._state:
+            self._outstanding += 1
+            self._buffer.append(message)
+            full_batch = len(self._buffer) >= self.batch_size
+        self.start()
+        if full_batch:
+            self._schedule_flush()
+        return message.future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every published message is confirmed or has failed."""
+        self._schedule_flush()
+        with self._state:
+            return self._state.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self.flush(timeout)
+        self._stopping = True
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.ioloop.add_callback_threadsafe(self._close_connection)
+            except AMQPError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._state:
+            abandoned = list(self._buffer) + list(self._unconfirmed.values())
+            self._buffer.clear()
+            self._unconfirmed.clear()
+        for message in abandoned:
+            self._fail(message, EventError(detail="Event publisher stopped before the broker confirmed"))
+
+    def _schedule_flush(self) -> None:
+        connection = self._connection
+        if connection is None or not self._ready:
+            return
+        try:
+            connection.ioloop.add_callback_threadsafe(self._flush)
+        except AMQPError:
+            pass
+
+    # Everything below runs on the publisher thread.
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._connection = pika.SelectConnection(
+                pika.URLParameters(self.url),
+                on_open_callback=self._on_connection_open,
+                on_open_error_callback=self._on_connection_error,
+                on_close_callback=self._on_connection_closed
+            )
+            self._connection.ioloop.start()
+            self._ready = False
+            self._connection = None
+            self._requeue_unconfirmed()
+            if not self._stopping:
+                time.sleep(self.reconnect_delay)
+
+    def _on_connection_open(self, connection: pika.SelectConnection) -> None:
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_error(self, connection: pika.SelectConnection, error: Exception) -> None:
+        logger.warning(f"Event publisher could not connect to RabbitMQ: {error}")
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection: pika.SelectConnection, reason: Exception) -> None:
+        if not self._stopping:
+            logger.warning(f"Event publisher connection closed: {reason}")
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel) -> None:
+        self._channel = channel
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.queue_declare(
+            queue=self.queue_name,
+            durable=True,
+            callback=lambda _frame: channel.confirm_delivery(
+                ack_nack_callback=self._on_confirm,
+                callback=self._on_confirm_selected
+            )
+        )
+
+    def _on_channel_closed(self, channel, reason: Exception) -> None:
+        logger.warning(f"Event publisher channel closed: {reason}")
+        self._close_connection()
+
+    def _on_confirm_selected(self, _frame) -> None:
+        self._delivery_tag = 0
+        self._ready = True
+        logger.info("Event publisher connected with publisher confirms")
+        self._tick()
+
+    def _tick(self) -> None:
+        if self._connection is None or not self._ready:
+            return
+        self._flush()
+        self._connection.ioloop.call_later(self.flush_interval, self._tick)
+
+    def _flush(self) -> None:
+        if not self._ready or self._channel is None or not self._channel.is_open:
+            return
+        while True:
+            with self._state:
+                if not self._buffer:
+                    return
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            for index, message in enumerate(batch):
+                try:
+                    self._channel.basic_publish(
+                        exchange='',
+                        routing_key=message.routing_key,
+                        body=message.body,
+                        properties=message.properties
+                    )
+                except AMQPError as e:
+                    logger.warning(f"Event publish failed, will retry after reconnect: {e}")
+                    with self._state:
+                        self._buffer.extendleft(reversed(batch[index:]))
+                    return
+                message.attempts += 1
+                self._delivery_tag += 1
+                with self._state:
+                    self._unconfirmed[self._delivery_tag] = message
+
+    def _on_confirm(self, frame) -> None:
+        method = frame.method
+        acked = isinstance(method, Basic.Ack)
+        with self._state:
+            if method.multiple:
+                settled = []
+                while self._unconfirmed:
+                    tag = next(iter(self._unconfirmed))
+                    if tag > method.delivery_tag:
+                        break
+                    settled.append(self._unconfirmed.pop(tag))
+            else:
+                message = self._unconfirmed.pop(method.delivery_tag, None)
+                settled = [message] if message is not None else []
+
+        for message in settled:
+            if acked:
+                self._succeed(message)
+            elif message.attempts < self.max_attempts:
+                with self._state:
+                    self._buffer.append(message)
+            else:
+                self._fail(message, EventError(detail="RabbitMQ rejected the event"))
+
+    def _requeue_unconfirmed(self) -> None:
+        with self._state:
+            in_flight = list(self._unconfirmed.values())
+            self._unconfirmed.clear()
+            self._buffer.extendleft(reversed(in_flight))
+
+    def _close_connection(self) -> None:
+        self._ready = False
+        connection = self._connection
+        if connection is None:
+            return
+        if connection.is_open:
+            connection.close()
+        elif not connection.is_closing:
+            connection.ioloop.stop()
+
+    def _succeed(self, message: PendingMessage) -> None:
+        # The caller may have cancelled the future while waiting; the slot
+        # is released either way.
+        if not message.future.done():
+            message.future.set_result(True)
+        self._settle()
+
+    def _fail(self, message: PendingMessage, error: Exception) -> None:
+        if not message.future.done():
+            message.future.set_exception(error)
+        self._settle()
+
+    def _settle(self) -> None:
+        self._slots.release()
+        with self._state:
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._state.notify_all()
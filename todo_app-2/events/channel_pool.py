@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Set
+
+import pika
+from pika.adapters.blocking_connection import BlockingChannel
+from pika.exceptions import AMQPError
+
+from common.exceptions import EventError
+
+logger = logging.getLogger(__name__)
+
+
+class PooledChannel:
+    """A connection with its single channel and the queues already declared on it."""
+
+    def __init__(self, url: str):
+        self.connection = pika.BlockingConnection(pika.URLParameters(url))
+        self.channel: BlockingChannel = self.connection.channel()
+        self._declared: Set[str] = set()
+
+    @property
+    def is_open(self) -> bool:
+        return self.connection.is_open and self.channel.is_open
+
+    def declare_queue(self, queue_name: str) -> None:
+        if queue_name not in self._declared:
+            self.channel.queue_declare(queue=queue_name, durable=True)
+            self._declared.add(queue_name)
+
+    def close(self) -> None:
+        try:
+            if self.connection.is_open:
+                self.connection.close()
+        except AMQPError as e:
+            logger.debug(f"Ignoring error while closing RabbitMQ connection: {e}")
+
+
+class ChannelPool:
+    """Long-lived RabbitMQ channels shared by the request threads.
+
+    pika's BlockingConnection is not thread-safe, so every channel is lent
+    to one thread at a time. Connections are opened lazily up to ``size``;
+    broken ones are dropped on return and reopened by the next borrower.
+    """
+
+    def __init__(self, url: str, size: int = 4, acquire_timeout: float = 5.0):
+        self.url = url
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self._idle: List[PooledChannel] = []
+        self._opened = 0
+        self._available = threading.Condition()
+        self._closed = False
+
+    @contextmanager
+    def channel(self) -> Iterator[PooledChannel]:
+        pooled = self._acquire()
+        healthy = False
+        try:
+            yield pooled
+            healthy = True
+        finally:
+            self._release(pooled, healthy)
+
+    def close(self) -> None:
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._available.notify_all()
+        for pooled in idle:
+            pooled.close()
+
+    def _acquire(self) -> PooledChannel:
+        while True:
+            pooled = self._take()
+            if pooled is None:
+                return self._open()
+            try:
+                # Services heartbeats missed while the connection sat idle.
+                pooled.connection.process_data_events(time_limit=0)
+            except AMQPError:
+                pass
+            if pooled.is_open:
+                return pooled
+            self._discard(pooled)
+
+    def _take(self) -> Optional[PooledChannel]:
+        """An idle channel, or None when the caller may open a new one."""
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._available:
+            while True:
+                if self._closed:
+                    raise EventError(detail="RabbitMQ channel pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._opened < self.size:
+                    self._opened += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise EventError(detail="Timed out waiting for a RabbitMQ channel")
+                self._available.wait(remaining)
+
+    def _open(self) -> PooledChannel:
+        try:
+            pooled = PooledChannel(self.url)
+        except Exception:
+            self._discard(None)
+            raise
+        logger.info("Opened pooled RabbitMQ connection")
+        return pooled
+
+    def _release(self, pooled: PooledChannel, healthy: bool) -> None:
+        if healthy and pooled.is_open:
+            with self._available:
+                if not self._closed:
+                    self._idle.append(pooled)
+                    self._available.notify()
+                    return
+        self._discard(pooled)
+
+    def _discard(self, pooled: Optional[PooledChannel]) -> None:
+        if pooled is not None:
+            pooled.close()
+        with self._available:
+            self._opened -= 1
+            self._available.notify()
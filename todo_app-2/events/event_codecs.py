@@ -0,0 +1,85 @@
+import json
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from common.exceptions import EventError
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; JSON always works
+    msgpack = None
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+DEFLATE_ENCODING = "deflate"
+
+
+class JsonCodec:
+    content_type = JSON_CONTENT_TYPE
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return json.dumps(message, separators=(",", ":"), default=str).encode("utf-8")
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return json.loads(body)
+
+
+class MsgpackCodec:
+    content_type = MSGPACK_CONTENT_TYPE
+
+    def __init__(self):
+        if msgpack is None:
+            raise EventError(detail="EVENT_CODEC=msgpack needs the msgpack package installed")
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return msgpack.packb(message, use_bin_type=True, default=str)
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(body, raw=False)
+
+
+CODECS = {
+    "json": JsonCodec,
+    JSON_CONTENT_TYPE: JsonCodec,
+    "msgpack": MsgpackCodec,
+    MSGPACK_CONTENT_TYPE: MsgpackCodec,
+}
+
+
+def get_codec(name: str):
+    codec = CODECS.get(name)
+    if codec is None:
+        raise EventError(detail=f"Unknown event codec: {name}")
+    return codec()
+
+
+class EventSerializer:
+    """Turns event envelopes into message bodies and back.
+
+    The codec travels in the AMQP ``content_type`` and compression in
+    ``content_encoding``, so consumers decode whatever they receive and
+    producers can switch codec without a coordinated deploy. Bodies
+    larger than ``compress_threshold`` bytes are deflated; ``0`` turns
+    compression off, since small events only grow when compressed.
+    """
+
+    def __init__(self, codec: str = "json", compress_threshold: int = 0, compress_level: int = 6):
+        self.codec = get_codec(codec)
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self._decoders = {self.codec.content_type: self.codec}
+
+    def dumps(self, message: Dict[str, Any]) -> Tuple[bytes, str, Optional[str]]:
+        body = self.codec.encode(message)
+        if self.compress_threshold and len(body) > self.compress_threshold:
+            return zlib.compress(body, self.compress_level), self.codec.content_type, DEFLATE_ENCODING
+        return body, self.codec.content_type, None
+
+    def loads(self, body: bytes, content_type: Optional[str] = None, content_encoding: Optional[str] = None) -> Dict[str, Any]:
+        if content_encoding == DEFLATE_ENCODING:
+            body = zlib.decompress(body)
+        content_type = content_type or JSON_CONTENT_TYPE
+        decoder = self._decoders.get(content_type)
+        if decoder is None:
+            decoder = self._decoders[content_type] = get_codec(content_type)
+        return decoder.decode(body)
@@ -1,7 +1,16 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime
 from pydantic import BaseModel, Field
 
+
+def new_event_id() -> str:
+    """Id of one emission. It is assigned once and reused by every retry and
+    relay of that event, so consumers can drop redeliveries. Two separate
+    changes that happen to carry the same payload still get different ids.
+    """
+    return str(uuid4())
+
+
 class EventBase(BaseModel):
     id: UUID = Field(..., description="Unique identifier for the event")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Timestamp when the event was created")
@@ -1,32 +1,127 @@
 import os
-import json
+import logging
 import pika
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pika.exceptions import AMQPError
 from common.exceptions import EventError
+from events.channel_pool import ChannelPool
+from events.batch_publisher import BatchPublisher
+from events.event_models import new_event_id
+from events.event_codecs import EventSerializer
+
+logger = logging.getLogger(__name__)
 
 class EventProducer:
-    def __init__(self):
+    def __init__(self, pool: Optional[ChannelPool] = None, publisher: Optional[BatchPublisher] = None):
         self.rabbitmq_url = os.getenv("RABBITMQ_URL")
         self.queue_name = os.getenv("TODO_QUEUE")
+        self.pool = pool or ChannelPool(
+            self.rabbitmq_url,
+            size=int(os.getenv("RABBITMQ_POOL_SIZE", "4"))
+        )
+        self.publisher = publisher
+        # EVENT_PUBLISH_MODE=batch hands events to a background publisher
+        # instead of waiting for the broker on the request thread.
+        if publisher is None and os.getenv("EVENT_PUBLISH_MODE", "sync") == "batch":
+            self.batch_publisher()
+        self.serializer = EventSerializer(
+            os.getenv("EVENT_CODEC", "json"),
+            compress_threshold=int(os.getenv("EVENT_COMPRESS_THRESHOLD", "0"))
+        )
+
+    def send_event(self, event_type: str, payload: dict, event_id: Optional[str] = None) -> None:
+        body, properties = self._encode(event_type, payload, event_id)
+
+        if self.publisher is not None:
+            future = self.publisher.publish(body, properties=properties)
+            future.add_done_callback(lambda f: self._log_failure(event_type, f))
+            return
+
+        # A pooled connection may have been dropped by the broker while idle;
+        # the second attempt runs on a freshly opened one.
+        for attempt in range(2):
+            try:
+                with self.pool.channel() as pooled:
+                    pooled.declare_queue(self.queue_name)
+                    pooled.channel.basic_publish(
+                        exchange='',
+                        routing_key=self.queue_name,
+                        body=body,
+                        properties=properties
+                    )
+                return
+            except AMQPError as e:
+                logger.warning(f"Publishing {event_type} failed (attempt {attempt + 1}): {e}")
+        raise EventError(detail=f"Could not publish {event_type} to RabbitMQ")
+
+    def send_events(
+        self,
+        events: List[Tuple[str, Dict[str, Any]]],
+        timeout: float = 10.0,
+        event_ids: Optional[List[str]] = None
+    ) -> List[bool]:
+        """Publish several events and report, per event, whether the broker took it.
 
-    def send_event(self, event_type: str, payload: dict) -> None:
-        connection = pika.BlockingConnection(pika.URLParameters(self.rabbitmq_url))
-        channel = connection.channel()
-        
-        channel.queue_declare(queue=self.queue_name, durable=True)
-        
-        try:
-            channel.basic_publish(
-                exchange='',
-                routing_key=self.queue_name,
-                body=json.dumps({
-                    'event_type': event_type,
-                    'payload': payload,
-                    'timestamp': datetime.utcnow().isoformat()
-                }),
-                properties=pika.BasicProperties(
-                    delivery_mode=2,
-                )
+        ``event_ids`` carries ids assigned earlier, e.g. outbox row ids, so a
+        republished event keeps its message_id.
+        """
+        event_ids = event_ids or [None] * len(events)
+        if self.publisher is not None:
+            futures = []
+            for (event_type, payload), event_id in zip(events, event_ids):
+                body, properties = self._encode(event_type, payload, event_id)
+                futures.append(self.publisher.publish(body, properties=properties))
+            self.publisher.flush(timeout)
+            return [future.done() and future.exception() is None for future in futures]
+
+        results = []
+        for (event_type, payload), event_id in zip(events, event_ids):
+            try:
+                self.send_event(event_type, payload, event_id)
+                results.append(True)
+            except EventError:
+                results.append(False)
+        return results
+
+    def batch_publisher(self) -> BatchPublisher:
+        """The background publisher, created on first use and then shared
+        by every event sent through this producer."""
+        if self.publisher is None:
+            self.publisher = BatchPublisher(
+                self.rabbitmq_url,
+                self.queue_name,
+                max_buffer=int(os.getenv("EVENT_BUFFER_SIZE", "10000")),
+                batch_size=int(os.getenv("EVENT_BATCH_SIZE", "500")),
+                flush_interval=float(os.getenv("EVENT_FLUSH_INTERVAL", "0.05"))
             )
-        finally:
-            connection.close()
\ No newline at end of file
+        return self.publisher
+
+    def close(self) -> None:
+        if self.publisher is not None:
+            self.publisher.stop()
+        self.pool.close()
+
+    def _encode(self, event_type: str, payload: dict, event_id: Optional[str] = None) -> Tuple[bytes, pika.BasicProperties]:
+        # Encoded once per emission: the retries below and the batch
+        # publisher's resends all carry this id.
+        event_id = event_id or new_event_id()
+        body, content_type, content_encoding = self.serializer.dumps({
+            'event_id': event_id,
+            'event_type': event_type,
+            'payload': payload,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        properties = pika.BasicProperties(
+            delivery_mode=2,
+            message_id=event_id,
+            content_type=content_type,
+            content_encoding=content_encoding
+        )
+        return body, properties
+
+    @staticmethod
+    def _log_failure(event_type: str, future) -> None:
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Event {event_type} was not confirmed by RabbitMQ: {error}")
@@ -48,6 +48,12 @@ class MockEventProducer:
         except Exception as e:
             print(f"⚠️ Could not add event to subscription queue: {e}")
     
+    def send_events(self, events, timeout: float = 10.0, event_ids=None):
+        """Відправити кілька подій (mock implementation)"""
+        for event_type, payload in events:
+            self.send_event(event_type, payload)
+        return [True] * len(events)
+
     def get_events(self):
         """Отримати всі події (для тестування)"""
         return self.events
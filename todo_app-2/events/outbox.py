@@ -1,14 +1,30 @@
-from typing import List, Dict, Any
-from uuid import UUID
-from datetime import datetime
-from sqlalchemy import create_engine, Column, String, DateTime, JSON
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Dict, Any, Iterator, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, Column, String, DateTime, JSON, Index, update, delete, insert, select
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import Boolean 
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlalchemy import Boolean
+
+from common.exceptions import OutboxError
+from events.event_models import new_event_id
+
+logger = logging.getLogger(__name__)
+
 Base = declarative_base()
 
 class OutboxMessage(Base):
     __tablename__ = 'outbox_messages'
+    # The relay polls "unprocessed, oldest first"; this index keeps that
+    # query a short range scan however many processed rows pile up.
+    __table_args__ = (
+        Index('ix_outbox_messages_processed_created_at', 'processed', 'created_at'),
+    )
 
     id = Column(String, primary_key=True)
     event_type = Column(String, nullable=False)
@@ -20,27 +36,299 @@ class OutboxMessage(Base):
     processed_at = Column(DateTime, nullable=True)
 
 
+class OutboxArchivedMessage(Base):
+    __tablename__ = 'outbox_messages_archive'
+
+    id = Column(String, primary_key=True)
+    event_type = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime)
+    aggregate_type = Column(String, nullable=False)
+    headers = Column(JSON, nullable=True)
+    processed = Column(Boolean, default=True)
+    processed_at = Column(DateTime, nullable=True)
+
+
+# For writers that add outbox rows on their own sqlite3 connection, inside
+# the transaction of the change itself (see SqliteToDoRepo). The values
+# are stored the way OutboxMessage stores them.
+INSERT_MESSAGE = (
+    "INSERT INTO outbox_messages (id, event_type, payload, created_at, aggregate_type, processed) "
+    "VALUES (?, ?, ?, ?, ?, 0)"
+)
+
+
+def message_row(event_type: str, payload: Dict[str, Any], aggregate_type: str = "todo") -> Tuple:
+    return (
+        new_event_id(),
+        event_type,
+        json.dumps(payload, default=str),
+        datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f"),
+        aggregate_type
+    )
+
+
 class Outbox:
-    def __init__(self, db_url: str):
-        self.engine = create_engine(db_url)
+    def __init__(self, db_url: str, creator: Optional[Callable[[], Any]] = None):
+        if creator is not None:
+            # SQLite connections opened by the caller, e.g. onto a repository's
+            # own database so the outbox shares its transactions.
+            self.engine = create_engine("sqlite://", creator=creator, poolclass=NullPool)
+        elif db_url in ("sqlite://", "sqlite:///:memory:"):
+            # One shared connection, otherwise every thread sees its own empty database.
+            self.engine = create_engine(
+                db_url,
+                poolclass=StaticPool,
+                connect_args={"check_same_thread": False}
+            )
+        else:
+            self.engine = create_engine(db_url)
         Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
+        for index in OutboxMessage.__table__.indexes:
+            index.create(self.engine, checkfirst=True)
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
 
-    def add_message(self, event_type: str, payload: Dict[str, Any]) -> None:
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
         session = self.Session()
-        message = OutboxMessage(id=str(UUID()), event_type=event_type, payload=payload)
-        session.add(message)
-        session.commit()
-        session.close()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
 
-    def get_messages(self) -> List[OutboxMessage]:
-        session = self.Session()
-        messages = session.query(OutboxMessage).all()
-        session.close()
-        return messages
+    def add_message(
+        self,
+        event_type: str,
+        payload: Dict[str, Any],
+        aggregate_type: str = "todo",
+        headers: Optional[Dict[str, Any]] = None,
+        session: Optional[Session] = None
+    ) -> str:
+        message = OutboxMessage(
+            id=new_event_id(),
+            event_type=event_type,
+            payload=payload,
+            aggregate_type=aggregate_type,
+            headers=headers,
+            processed=False,
+            created_at=datetime.utcnow()
+        )
+        if session is not None:
+            session.add(message)
+            return message.id
+        try:
+            with self.session_scope() as own_session:
+                own_session.add(message)
+        except Exception as e:
+            raise OutboxError(detail=f"Could not store {event_type} in the outbox: {e}")
+        return message.id
+
+    def claim_batch(self, session: Session, limit: int) -> List[OutboxMessage]:
+        """Oldest unprocessed messages, locked for this session where the database supports it."""
+        return (
+            session.query(OutboxMessage)
+            .filter(OutboxMessage.processed.is_(False))
+            .order_by(OutboxMessage.created_at, OutboxMessage.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def mark_processed(self, session: Session, message_ids: List[str]) -> int:
+        if not message_ids:
+            return 0
+        result = session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(message_ids))
+            .values(processed=True, processed_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def get_messages(self, limit: int = 100, processed: Optional[bool] = None) -> List[OutboxMessage]:
+        with self.session_scope() as session:
+            query = session.query(OutboxMessage)
+            if processed is not None:
+                query = query.filter(OutboxMessage.processed.is_(processed))
+            return query.order_by(OutboxMessage.created_at).limit(limit).all()
 
     def clear_messages(self) -> None:
-        session = self.Session()
-        session.query(OutboxMessage).delete()
-        session.commit()
-        session.close()
\ No newline at end of file
+        with self.session_scope() as session:
+            session.query(OutboxMessage).delete()
+
+    def purge_processed(
+        self,
+        older_than: timedelta,
+        chunk_size: int = 1000,
+        archive: bool = False,
+        pause: float = 0.0,
+        should_stop=None
+    ) -> Dict[str, float]:
+        """Delete (or move to the archive table) processed rows older than ``older_than``.
+
+        Works in chunks of ``chunk_size`` rows, one short transaction each,
+        so the relay and the write path never wait behind a long delete.
+        ``pause`` sleeps between chunks to let other writers in.
+        """
+        cutoff = datetime.utcnow() - older_than
+        columns = [column.name for column in OutboxMessage.__table__.columns]
+        removed = 0
+        started = time.monotonic()
+
+        while should_stop is None or not should_stop():
+            with self.session_scope() as session:
+                # Walks the (processed, created_at) index from the oldest row.
+                ids = session.execute(
+                    select(OutboxMessage.id)
+                    .where(OutboxMessage.processed.is_(True), OutboxMessage.created_at < cutoff)
+                    .order_by(OutboxMessage.created_at)
+                    .limit(chunk_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                if archive:
+                    session.execute(
+                        insert(OutboxArchivedMessage).from_select(
+                            columns,
+                            select(*[OutboxMessage.__table__.c[name] for name in columns])
+                            .where(OutboxMessage.id.in_(ids))
+                        )
+                    )
+                session.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(ids)))
+            removed += len(ids)
+            if len(ids) < chunk_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+        elapsed = time.monotonic() - started
+        stats = {
+            "removed": removed,
+            "archived": removed if archive else 0,
+            "seconds": elapsed,
+            "rows_per_second": removed / elapsed if elapsed > 0 else 0.0
+        }
+        if removed:
+            logger.info(
+                f"Outbox retention {'archived' if archive else 'deleted'} {removed} rows "
+                f"in {elapsed:.2f}s ({stats['rows_per_second']:.0f} rows/s)"
+            )
+        return stats
+
+
+class OutboxRelay:
+    """Moves outbox rows to RabbitMQ from a background thread.
+
+    Every poll claims at most ``batch_size`` unprocessed rows in creation
+    order and commits, publishes them with no transaction open, then marks
+    the published ones processed with a single UPDATE in a second, short
+    transaction. Waiting for broker confirms therefore holds no row locks
+    and, on SQLite, no write lock that would stall the API. Rows that fail
+    to publish stay unprocessed and are picked up again by the next poll;
+    a row sent but not yet marked (the process died, or another relay
+    claimed it meanwhile) is sent again, which consumers drop as a
+    duplicate because the row id is the event id.
+    """
+
+    def __init__(self, outbox: Outbox, event_producer, batch_size: int = 100, poll_interval: float = 1.0):
+        self.outbox = outbox
+        self.event_producer = event_producer
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        with self.outbox.session_scope() as session:
+            messages = self.outbox.claim_batch(session, self.batch_size)
+        if not messages:
+            return 0
+        results = self.event_producer.send_events(
+            [(message.event_type, message.payload) for message in messages],
+            event_ids=[message.id for message in messages]
+        )
+        published = [message.id for message, ok in zip(messages, results) if ok]
+        with self.outbox.session_scope() as session:
+            return self.outbox.mark_processed(session, published)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                relayed = self.run_once()
+            except Exception as e:
+                logger.error(f"Outbox relay failed: {e}")
+                relayed = 0
+            # A full batch means there is a backlog, so poll again right away.
+            if relayed < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+
+class OutboxRetentionJob:
+    """Periodically purges relayed outbox rows older than ``retention``."""
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        retention: timedelta,
+        interval: float = 300.0,
+        chunk_size: int = 1000,
+        archive: bool = False,
+        pause: float = 0.01
+    ):
+        self.outbox = outbox
+        self.retention = retention
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.archive = archive
+        self.pause = pause
+        self.last_run: Optional[Dict[str, float]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, float]:
+        self.last_run = self.outbox.purge_processed(
+            self.retention,
+            chunk_size=self.chunk_size,
+            archive=self.archive,
+            pause=self.pause,
+            should_stop=self._stop.is_set
+        )
+        return self.last_run
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Outbox retention failed: {e}")
+            self._stop.wait(self.interval)
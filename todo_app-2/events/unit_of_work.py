@@ -0,0 +1,145 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from common.exceptions import OutboxError
+from events.outbox import Outbox
+
+Event = Tuple[str, Dict[str, Any]]
+
+_collector: ContextVar[Optional["EventCollector"]] = ContextVar("event_collector", default=None)
+
+
+class EventCollector:
+    """Domain events recorded during one unit of work.
+
+    With ``coalesce`` on, events for the same todo id are merged: a todo
+    created and then updated yields one ``todo_created`` with the final
+    state, repeated updates yield the last one, and a todo created and
+    deleted in the same unit yields nothing at all.
+    """
+
+    def __init__(self, coalesce: bool = True):
+        self.coalesce = coalesce
+        self._events: List[Optional[List[Any]]] = []
+        self._positions: Dict[str, int] = {}
+
+    def record(self, event_type: str, payload: Dict[str, Any]) -> None:
+        key = payload.get("id") if self.coalesce else None
+        position = self._positions.get(key) if key is not None else None
+        if position is None:
+            self._append(key, event_type, payload)
+            return
+
+        previous_type = self._events[position][0]
+        if event_type == "todo_deleted" and previous_type == "todo_created":
+            self._events[position] = None
+            del self._positions[key]
+        elif event_type == "todo_deleted":
+            self._events[position] = [event_type, payload]
+        elif event_type == "todo_updated" and previous_type in ("todo_created", "todo_updated"):
+            self._events[position][1] = payload
+        else:
+            self._append(key, event_type, payload)
+
+    def events(self) -> List[Event]:
+        return [(event[0], event[1]) for event in self._events if event is not None]
+
+    def _append(self, key: Optional[str], event_type: str, payload: Dict[str, Any]) -> None:
+        if key is not None:
+            self._positions[key] = len(self._events)
+        self._events.append([event_type, payload])
+
+
+class UnitOfWork:
+    """Collects the events of a mutation and publishes them once it succeeds.
+
+    Repositories call ``record`` instead of talking to the broker; the
+    service wraps each operation in ``begin()``. Nested ``begin()`` calls
+    join the outer unit, so several operations can be grouped and their
+    events coalesced. Events recorded outside any unit are published
+    right away. If the unit fails, its events are dropped.
+    """
+
+    def __init__(self, event_producer, outbox: Optional[Outbox] = None, coalesce: bool = True):
+        self.event_producer = event_producer
+        self.outbox = outbox
+        self.coalesce = coalesce
+
+    @contextmanager
+    def begin(self) -> Iterator[EventCollector]:
+        current = _collector.get()
+        if current is not None:
+            yield current
+            return
+
+        collector = EventCollector(self.coalesce)
+        token = _collector.set(collector)
+        try:
+            yield collector
+        finally:
+            _collector.reset(token)
+        self.publish(collector.events())
+
+    def record(self, event_type: str, payload: Dict[str, Any]) -> None:
+        current = _collector.get()
+        if current is not None:
+            current.record(event_type, payload)
+        else:
+            self.publish([(event_type, payload)])
+
+    def publish(self, events: List[Event]) -> None:
+        if not events:
+            return
+        # With an outbox all events of the unit are committed in one
+        # transaction and published later by OutboxRelay.
+        if self.outbox is not None:
+            try:
+                with self.outbox.session_scope() as session:
+                    for event_type, payload in events:
+                        self.outbox.add_message(event_type, payload, session=session)
+            except Exception as e:
+                raise OutboxError(detail=f"Could not store {len(events)} events in the outbox: {e}")
+            return
+        for event_type, payload in events:
+            self.event_producer.send_event(event_type, payload)
+
+
+class AsyncUnitOfWork(UnitOfWork):
+    """UnitOfWork for the async request path.
+
+    ``begin_async`` collects events like ``begin`` and awaits their
+    publication through an AsyncEventProducer. Synchronous repository
+    code running inside it, inline or in a worker thread, records into
+    the same collector because context variables follow both.
+    """
+
+    @asynccontextmanager
+    async def begin_async(self) -> AsyncIterator[EventCollector]:
+        current = _collector.get()
+        if current is not None:
+            yield current
+            return
+
+        collector = EventCollector(self.coalesce)
+        token = _collector.set(collector)
+        try:
+            yield collector
+        finally:
+            _collector.reset(token)
+        await self.publish_async(collector.events())
+
+    def record(self, event_type: str, payload: Dict[str, Any]) -> None:
+        current = _collector.get()
+        if current is None:
+            raise RuntimeError("AsyncUnitOfWork.record must run inside begin_async()")
+        current.record(event_type, payload)
+
+    async def publish_async(self, events: List[Event]) -> None:
+        if not events:
+            return
+        if self.outbox is not None:
+            await asyncio.to_thread(self.publish, events)
+            return
+        await self.event_producer.send_events(events)
@@ -1,6 +1,5 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-import strawberry.fastapi
 from contextlib import asynccontextmanager
 
 from graphqlapi.schema import schema
@@ -14,6 +13,7 @@ from services.mock_services import (
 from repositories.todo_repository import ToDoRepo
 from events.mock_event_producer import MockEventProducer
 from graphqlapi.dataloaders import create_dataloaders
+from graphqlapi.router import GraphQLRouter
 
 event_producer = MockEventProducer() 
 todo_repo = ToDoRepo(event_producer)
@@ -58,7 +58,7 @@ def get_graphql_context(
     
     return context
 
-graphql_app = strawberry.fastapi.GraphQLRouter(
+graphql_app = GraphQLRouter(
     schema=schema,
     context_getter=get_graphql_context,
     graphiql=True 
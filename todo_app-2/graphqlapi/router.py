@@ -0,0 +1,10 @@
+import orjson
+import strawberry.fastapi
+
+
+class GraphQLRouter(strawberry.fastapi.GraphQLRouter):
+    """Strawberry's FastAPI router with responses encoded by orjson."""
+
+    def encode_json(self, data: object) -> str:
+        # Multipart (incremental) responses join this into a str body.
+        return orjson.dumps(data).decode()
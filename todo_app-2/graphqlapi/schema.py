@@ -143,11 +143,34 @@ class UserSettingsType:
 
 @strawberry.type
 class PaginatedTodosType:
-    page: int
+    page: Optional[int]
     size: int
     total_items: int
-    total_pages: int
+    total_pages: Optional[int]
     items: List[TodoType]
+    next_cursor: Optional[str] = None
+
+@strawberry.type
+class PriorityCountsType:
+    low: int
+    medium: int
+    high: int
+
+@strawberry.type
+class DueCountsType:
+    overdue: int
+    today: int
+    this_week: int
+    later: int
+    no_due_date: int
+
+@strawberry.type
+class TodoStatsType:
+    total: int
+    completed: int
+    open: int
+    by_priority: PriorityCountsType
+    due: DueCountsType
 
 @strawberry.type
 class EventType:
@@ -175,6 +198,7 @@ class UpdateTodoInput:
 class PaginationInput:
     page: int = 1
     size: int = 10
+    cursor: Optional[str] = None
 
 @strawberry.input
 class FilterInput:
@@ -221,7 +245,8 @@ class Query:
 
         page_input = Pagination(
             page=pagination.page if pagination else 1,
-            size=pagination.size if pagination else 10
+            size=pagination.size if pagination else 10,
+            cursor=pagination.cursor if pagination else None
         )
         
         filter_input = Filter()
@@ -253,6 +278,41 @@ class Query:
             priority=todo['priority']
         ) for todo in result['items']]
         
+        return PaginatedTodosType(
+            page=result['page'],
+            size=result['size'],
+            total_items=result['total_items'],
+            total_pages=result['total_pages'],
+            items=todos,
+            next_cursor=result['next_cursor']
+        )
+    
+    @strawberry.field
+    def search_todos(
+        self,
+        info: Info,
+        query: str,
+        pagination: Optional[PaginationInput] = None
+    ) -> PaginatedTodosType:
+        todo_service = info.context['todo_service']
+
+        page_input = Pagination(
+            page=pagination.page if pagination else 1,
+            size=pagination.size if pagination else 10
+        )
+        result = todo_service.search_todos(query, page_input)
+
+        todos = [TodoType(
+            id=str(todo['id']),
+            title=todo['title'],
+            description=todo.get('description'),
+            is_completed=todo['is_completed'],
+            created_at=str(todo['created_at']),
+            updated_at=None,
+            due_date=str(todo['due_date']) if todo.get('due_date') else None,
+            priority=todo['priority']
+        ) for todo in result['items']]
+
         return PaginatedTodosType(
             page=result['page'],
             size=result['size'],
@@ -261,6 +321,23 @@ class Query:
             items=todos
         )
     
+    @strawberry.field
+    def todo_stats(self, info: Info) -> TodoStatsType:
+        todo_service = info.context['todo_service']
+        stats = todo_service.get_stats()
+        by_priority = stats['by_priority']
+        return TodoStatsType(
+            total=stats['total'],
+            completed=stats['completed'],
+            open=stats['open'],
+            by_priority=PriorityCountsType(
+                low=by_priority['LOW'],
+                medium=by_priority['MEDIUM'],
+                high=by_priority['HIGH']
+            ),
+            due=DueCountsType(**stats['due'])
+        )
+
     @strawberry.field
     def user(self, info: Info, id: str) -> Optional[UserType]:
         user_service = info.context.get('user_service')
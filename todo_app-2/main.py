@@ -5,18 +5,55 @@ from opentracing.propagation import Format
 from jaeger_client import Config
 import os
 import logging
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from dotenv import load_dotenv
 
-from routers.todo_router import router as todo_router
+from events.outbox import OutboxRelay, OutboxRetentionJob
+
+# API_MODE=async serves the same routes as async handlers that never block
+# a threadpool worker on the broker.
+if os.getenv("API_MODE", "sync") == "async":
+    from routers import async_todo_router as todo_routes
+else:
+    from routers import todo_router as todo_routes
+todo_router, event_producer, outbox = todo_routes.router, todo_routes.event_producer, todo_routes.outbox
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    workers = []
+    if outbox is not None:
+        workers.append(OutboxRelay(
+            outbox,
+            event_producer,
+            batch_size=int(os.getenv("OUTBOX_RELAY_BATCH_SIZE", "100")),
+            poll_interval=float(os.getenv("OUTBOX_RELAY_POLL_INTERVAL", "1.0"))
+        ))
+        workers.append(OutboxRetentionJob(
+            outbox,
+            retention=timedelta(hours=float(os.getenv("OUTBOX_RETENTION_HOURS", "24"))),
+            interval=float(os.getenv("OUTBOX_RETENTION_INTERVAL", "300")),
+            chunk_size=int(os.getenv("OUTBOX_RETENTION_CHUNK_SIZE", "1000")),
+            archive=os.getenv("OUTBOX_ARCHIVE", "false").lower() == "true"
+        ))
+    for worker in workers:
+        worker.start()
+    yield
+    for worker in workers:
+        worker.stop()
+    # Waits for buffered events to be confirmed, then closes the repository
+    # and its connections.
+    todo_routes.close()
+
 app = FastAPI(
     title="ToDo API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 
 from pydantic import BaseModel, Field, validator
@@ -41,6 +41,7 @@ class Request(BaseModel):
 class Pagination(BaseModel):
     page: int = Field(1, ge=1)
     size: int = Field(10, ge=1, le=100)
+    cursor: Optional[str] = None
 
 class Filter(BaseModel):
     completed: Optional[bool] = None
@@ -50,4 +51,43 @@ class Filter(BaseModel):
 
 class Error(BaseModel):
     code: int
-    msg: str
\ No newline at end of file
+    msg: str
+
+class Todo(BaseModel):
+    id: UUID
+    title: str
+    description: Optional[str]
+    is_completed: bool
+    created_at: datetime
+    due_date: Optional[date]
+    priority: Optional[PriorityEnum]
+
+class TodoPage(BaseModel):
+    page: Optional[int]
+    size: int
+    total_items: int
+    total_pages: Optional[int]
+    items: List[Todo]
+    next_cursor: Optional[str]
+
+class DueCounts(BaseModel):
+    overdue: int
+    today: int
+    this_week: int
+    later: int
+    no_due_date: int
+
+class TodoStats(BaseModel):
+    total: int
+    completed: int
+    open: int
+    by_priority: Dict[PriorityEnum, int]
+    due: DueCounts
+
+class SearchPage(BaseModel):
+    query: str
+    page: int
+    size: int
+    total_items: int
+    total_pages: int
+    items: List[Todo]
@@ -1,14 +1,18 @@
 import pika
-import json
 import os
 import logging
 import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from jaeger_client import Config
 import opentracing
 from config import settings
 
+from common.exceptions import EventError
+from events.batch_publisher import BatchPublisher
+from events.event_models import new_event_id
+from events.event_codecs import EventSerializer
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -32,6 +36,11 @@ class EventProducer:
         self.tracer = tracer or init_tracer()
         self.connection = None
         self.channel = None
+        self.batch_publisher: Optional[BatchPublisher] = None
+        self.serializer = EventSerializer(
+            os.getenv('EVENT_CODEC', 'json'),
+            compress_threshold=int(os.getenv('EVENT_COMPRESS_THRESHOLD', '0'))
+        )
         self._setup_connection()
 
     def _setup_connection(self):
@@ -62,13 +71,7 @@ class EventProducer:
             span.set_tag('event_type', event_type)
             span.set_tag('correlation_id', correlation_id)
             
-            message = {
-                'event_type': event_type,
-                'payload': payload,
-                'timestamp': datetime.utcnow().isoformat(),
-                'correlation_id': correlation_id,
-                'service': settings.jaeger_service_name
-            }
+            body, properties = self._serialize(self._build_message(event_type, payload, correlation_id))
             
             try:
                 for attempt in range(3):
@@ -76,12 +79,8 @@ class EventProducer:
                         self.channel.basic_publish(
                             exchange='',
                             routing_key=settings.queue_name,
-                            body=json.dumps(message),
-                            properties=pika.BasicProperties(
-                                delivery_mode=2,
-                                correlation_id=correlation_id,
-                                headers={'event_type': event_type}
-                            )
+                            body=body,
+                            properties=properties
                         )
                         
                         logger.info(f"Event sent successfully: {event_type} (attempt {attempt + 1})")
@@ -102,19 +101,43 @@ class EventProducer:
                 span.set_tag('success', False)
                 return False
 
-    def send_batch_events(self, events: list) -> Dict[str, int]:
+    def send_batch_events(self, events: list, timeout: float = 30.0) -> Dict[str, int]:
+        """Publish a batch through the confirm-tracking background publisher.
+
+        All events are buffered at once and flushed together; the call then
+        waits up to ``timeout`` seconds for the broker to confirm them. When
+        the buffer is full, the events already buffered are flushed before
+        one more try; an event that still does not fit counts as failed.
+        """
         with self.tracer.start_span('send_batch_events') as span:
             stats = {'success': 0, 'failed': 0}
             span.set_tag('batch_size', len(events))
-            
+
+            publisher = self._get_batch_publisher()
+            futures = []
             for event in events:
-                success = self.send_event(
-                    event['event_type'], 
+                message = self._build_message(
+                    event['event_type'],
                     event['payload'],
-                    event.get('correlation_id')
+                    event.get('correlation_id'),
+                    event.get('event_id')
                 )
-                
-                if success:
+                body, properties = self._serialize(message)
+                for attempt in range(2):
+                    try:
+                        futures.append(publisher.publish(body, properties=properties))
+                        break
+                    except EventError as e:
+                        logger.warning(f"Buffering {event['event_type']} failed (attempt {attempt + 1}): {e.detail}")
+                        if attempt == 0:
+                            publisher.flush(timeout)
+                        else:
+                            logger.error(f"Dropped {event['event_type']} from the batch: {e.detail}")
+                            stats['failed'] += 1
+
+            publisher.flush(timeout)
+            for future in futures:
+                if future.done() and future.exception() is None:
                     stats['success'] += 1
                 else:
                     stats['failed'] += 1
@@ -125,8 +148,45 @@ class EventProducer:
             logger.info(f"Batch processing completed: {stats}")
             return stats
 
+    def _get_batch_publisher(self) -> BatchPublisher:
+        if self.batch_publisher is None:
+            self.batch_publisher = BatchPublisher(
+                settings.message_broker_url,
+                settings.queue_name
+            )
+        return self.batch_publisher
+
+    def _build_message(
+        self,
+        event_type: str,
+        payload: Dict[str, Any],
+        correlation_id: Optional[str],
+        event_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return {
+            'event_id': event_id or new_event_id(),
+            'event_type': event_type,
+            'payload': payload,
+            'timestamp': datetime.utcnow().isoformat(),
+            'correlation_id': correlation_id,
+            'service': settings.jaeger_service_name
+        }
+
+    def _serialize(self, message: Dict[str, Any]) -> Tuple[bytes, pika.BasicProperties]:
+        body, content_type, content_encoding = self.serializer.dumps(message)
+        return body, pika.BasicProperties(
+            delivery_mode=2,
+            message_id=message['event_id'],
+            correlation_id=message['correlation_id'],
+            content_type=content_type,
+            content_encoding=content_encoding,
+            headers={'event_type': message['event_type']}
+        )
+
     def close(self):
         """Закриття з'єднання"""
+        if self.batch_publisher is not None:
+            self.batch_publisher.stop()
         if self.connection and not self.connection.is_closed:
             self.connection.close()
             logger.info("RabbitMQ connection closed")
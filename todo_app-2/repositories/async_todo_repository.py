@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from uuid import UUID
+
+from models.todo_models import Create, Filter
+from repositories.todo_index import IndexEntry
+from repositories.todo_repository import ToDoRepo
+from repositories.sqlite_todo_repository import SqliteToDoRepo
+
+
+class AsyncToDoRepo:
+    """Awaitable front for ToDoRepo and SqliteToDoRepo.
+
+    The in-memory repository only does short, lock-protected work, so it
+    is called inline on the event loop. SQLite calls can block on disk or
+    on the write lock and are moved to a worker thread instead.
+    """
+
+    def __init__(self, repository: Union[ToDoRepo, SqliteToDoRepo], offload: Optional[bool] = None):
+        self.repository = repository
+        self.unit_of_work = repository.unit_of_work
+        self.offload = isinstance(repository, SqliteToDoRepo) if offload is None else offload
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        return await self._call(self.repository.get_all)
+
+    async def query(
+        self,
+        filters: Filter,
+        sort_by: str,
+        descending: bool,
+        offset: int,
+        limit: int,
+        after: Optional[IndexEntry] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        return await self._call(self.repository.query, filters, sort_by, descending, offset, limit, after)
+
+    async def search(self, query: str, offset: int, limit: int) -> Tuple[int, List[Dict[str, Any]]]:
+        return await self._call(self.repository.search, query, offset, limit)
+
+    async def stats(self) -> Dict[str, Any]:
+        return await self._call(self.repository.stats)
+
+    async def get_by_id(self, todo_id: UUID) -> Dict[str, Any]:
+        return await self._call(self.repository.get_by_id, todo_id)
+
+    async def create(self, todo_data: Create) -> Dict[str, Any]:
+        return await self._call(self.repository.create, todo_data)
+
+    async def update(self, todo_id: UUID, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._call(self.repository.update, todo_id, update_data)
+
+    async def delete(self, todo_id: UUID) -> None:
+        await self._call(self.repository.delete, todo_id)
+
+    async def _call(self, method: Callable, *args):
+        if self.offload:
+            # to_thread copies the context, so events still reach the unit of work.
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
@@ -0,0 +1,41 @@
+import logging
+import os
+from typing import Callable, Optional, Union
+
+from events.event_producer import EventProducer
+from events.outbox import Outbox
+from events.unit_of_work import UnitOfWork
+from repositories.todo_repository import ToDoRepo
+from repositories.sqlite_todo_repository import SqliteToDoRepo
+
+logger = logging.getLogger(__name__)
+
+
+def create_todo_repository(
+    event_producer: EventProducer,
+    outbox_url: Optional[str] = None,
+    database_url: Optional[str] = None,
+    make_unit_of_work: Optional[Callable[[Optional[Outbox]], UnitOfWork]] = None
+) -> Union[ToDoRepo, SqliteToDoRepo]:
+    """SQLite storage when DATABASE_URL is set, the in-memory repository otherwise.
+
+    OUTBOX_DATABASE_URL turns on the outbox. A SQLite repository keeps it
+    in its own database so each change and its event commit together; the
+    in-memory repository stores events at outbox_url through the unit of
+    work. Either way the repository's ``outbox`` is the one to relay.
+    """
+    database_url = database_url or os.getenv("DATABASE_URL")
+    outbox_url = outbox_url or os.getenv("OUTBOX_DATABASE_URL")
+    if database_url:
+        if outbox_url and outbox_url != database_url:
+            logger.warning(f"Outbox rows are kept in {database_url}, not {outbox_url}, to share its transactions")
+        unit_of_work = make_unit_of_work(None) if make_unit_of_work else None
+        return SqliteToDoRepo(
+            database_url,
+            event_producer,
+            unit_of_work=unit_of_work,
+            transactional_outbox=bool(outbox_url)
+        )
+    outbox = Outbox(outbox_url) if outbox_url else None
+    unit_of_work = make_unit_of_work(outbox) if make_unit_of_work else None
+    return ToDoRepo(event_producer, outbox=outbox, unit_of_work=unit_of_work)
@@ -0,0 +1,170 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+TITLE_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
+# Terms shorter than this only match whole tokens; a one-letter prefix
+# would pull in most of the vocabulary.
+MIN_PREFIX_LENGTH = 2
+PREFIX_PENALTY = 0.5
+# SubstringIndex keeps every substring up to this long.
+GRAM_LENGTH = 3
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def grams(texts: Iterable[str]) -> Set[str]:
+    return {
+        text[start:start + length]
+        for text in texts
+        for length in range(1, GRAM_LENGTH + 1)
+        for start in range(len(text) - length + 1)
+    }
+
+
+class SearchIndex:
+    """Inverted index over todo titles and descriptions.
+
+    Every token maps to the todos containing it together with a weight
+    (title occurrences count more than description ones). A sorted
+    vocabulary lets each query term also match the tokens it is a
+    prefix of, found by bisection. All terms must match; results are
+    ranked by the summed, idf-scaled weights of the matching tokens, with
+    exact token matches scoring above prefix matches.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Hashable, int]] = {}
+        self._vocabulary: List[str] = []
+        self._documents: Dict[Hashable, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, doc_id: Hashable, title: Optional[str], description: Optional[str]) -> None:
+        if doc_id in self._documents:
+            self.remove(doc_id)
+        weights: Dict[str, int] = {}
+        for token in tokenize(title):
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(description):
+            weights[token] = weights.get(token, 0) + DESCRIPTION_WEIGHT
+        self._documents[doc_id] = weights
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[doc_id] = weight
+
+    def remove(self, doc_id: Hashable) -> None:
+        weights = self._documents.pop(doc_id, None)
+        if weights is None:
+            return
+        for token in weights:
+            postings = self._postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def search(self, query: str, offset: int = 0, limit: Optional[int] = None) -> Tuple[int, List[Hashable]]:
+        """Total number of matches and the ids of one page, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return 0, []
+
+        scores: Optional[Dict[Hashable, float]] = None
+        # Rarest term first, so the candidate set shrinks as early as possible.
+        for term_scores in sorted((self._term_scores(term) for term in terms), key=len):
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc_id: score + term_scores[doc_id] for doc_id, score in scores.items() if doc_id in term_scores}
+            if not scores:
+                return 0, []
+
+        ranked = ((-score, doc_id) for doc_id, score in scores.items())
+        if limit is None:
+            page = sorted(ranked)[offset:]
+        else:
+            page = heapq.nsmallest(offset + limit, ranked)[offset:]
+        return len(scores), [doc_id for _, doc_id in page]
+
+    def _term_scores(self, term: str) -> Dict[Hashable, float]:
+        scores: Dict[Hashable, float] = {}
+        total = len(self._documents)
+        for token in self._matching_tokens(term):
+            postings = self._postings[token]
+            idf = math.log(1 + total / len(postings))
+            factor = idf if token == term else idf * PREFIX_PENALTY
+            for doc_id, weight in postings.items():
+                score = weight * factor
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def _matching_tokens(self, term: str) -> List[str]:
+        if len(term) < MIN_PREFIX_LENGTH:
+            return [term] if term in self._postings else []
+        tokens = []
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            tokens.append(self._vocabulary[position])
+            position += 1
+        return tokens
+
+
+class SubstringIndex:
+    """Finds the todos whose title or description contains a string,
+    ignoring case, without scanning every todo.
+
+    Every substring of up to GRAM_LENGTH characters maps to the todos
+    containing it. A query that short is a single lookup; a longer one
+    intersects the postings of its grams and checks the text of the
+    todos left.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[Hashable]] = {}
+        self._texts: Dict[Hashable, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, doc_id: Hashable, title: Optional[str], description: Optional[str]) -> None:
+        if doc_id in self._texts:
+            self.remove(doc_id)
+        texts = tuple(text.lower() for text in (title, description) if text)
+        self._texts[doc_id] = texts
+        for gram in grams(texts):
+            self._postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id: Hashable) -> None:
+        texts = self._texts.pop(doc_id, None)
+        if texts is None:
+            return
+        for gram in grams(texts):
+            postings = self._postings[gram]
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[gram]
+
+    def search(self, query: str) -> Set[Hashable]:
+        needle = query.lower()
+        if len(needle) <= GRAM_LENGTH:
+            return set(self._postings.get(needle, ()))
+        postings = sorted(
+            (self._postings.get(needle[start:start + GRAM_LENGTH], set())
+             for start in range(len(needle) - GRAM_LENGTH + 1)),
+            key=len
+        )
+        candidates = postings[0].intersection(*postings[1:])
+        return {doc_id for doc_id in candidates if any(needle in text for text in self._texts[doc_id])}
@@ -0,0 +1,486 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from models.todo_models import Create, Filter
+from common.exceptions import FoundError
+from events.event_producer import EventProducer
+from events.outbox import INSERT_MESSAGE, Outbox, message_row
+from events.unit_of_work import UnitOfWork
+from repositories.todo_index import SORT_FIELDS, IndexEntry
+from repositories.todo_record import PRIORITIES, NO_DUE_DATE, TIMESTAMP_FORMAT, format_timestamp
+from repositories.todo_stats import stats_dict, sum_due_buckets
+from repositories.search_index import MIN_PREFIX_LENGTH, TITLE_WEIGHT, DESCRIPTION_WEIGHT, tokenize
+
+# due_date is stored as its ordinal in due_ord so it sorts and ranges as an
+# integer; undated todos get a value past every real date, which matches the
+# (undated, 0) key of the in-memory index.
+UNDATED_ORD = date.max.toordinal() + 1
+
+SORT_COLUMNS = {"created_at": "created_at", "due_date": "due_ord"}
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS todos (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        is_completed INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL,
+        due_date TEXT,
+        due_ord INTEGER NOT NULL,
+        priority TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_todos_created_at ON todos (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_todos_due_ord ON todos (due_ord, id)",
+    "CREATE INDEX IF NOT EXISTS ix_todos_completed_created_at ON todos (is_completed, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_todos_priority_due_ord ON todos (priority, due_ord)",
+    # created_at is compared as text. Rows written before it was fixed width
+    # lack the fraction on whole seconds ("...:00Z") and would sort after
+    # "...:00.000001Z".
+    "UPDATE todos SET created_at = substr(created_at, 1, 19) || '.000000Z' WHERE length(created_at) = 20",
+)
+
+# Full-text search: an FTS5 index over the todos table kept current by
+# triggers, with prefix indexes so "gro*" does not scan the vocabulary.
+SEARCH_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+        title, description, content='todos', content_rowid='rowid', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts (todos_fts, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title, description ON todos BEGIN
+        INSERT INTO todos_fts (todos_fts, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO todos_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+)
+
+# Running aggregates kept by triggers: row counts per (is_completed,
+# priority) and open todos per due date, so stats never scan todos.
+STATS_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS todo_totals (
+        is_completed INTEGER NOT NULL,
+        priority TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        PRIMARY KEY (is_completed, priority)
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS todo_open_due (due_ord INTEGER PRIMARY KEY, n INTEGER NOT NULL)",
+    """
+    CREATE TRIGGER IF NOT EXISTS todo_stats_insert AFTER INSERT ON todos BEGIN
+        INSERT INTO todo_totals VALUES (new.is_completed, IFNULL(new.priority, ''), 1)
+        ON CONFLICT DO UPDATE SET n = n + 1;
+        INSERT INTO todo_open_due SELECT new.due_ord, 1 WHERE new.is_completed = 0
+        ON CONFLICT DO UPDATE SET n = n + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todo_stats_delete AFTER DELETE ON todos BEGIN
+        UPDATE todo_totals SET n = n - 1
+        WHERE is_completed = old.is_completed AND priority = IFNULL(old.priority, '');
+        UPDATE todo_open_due SET n = n - 1 WHERE due_ord = old.due_ord AND old.is_completed = 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todo_stats_update AFTER UPDATE OF is_completed, priority, due_ord ON todos BEGIN
+        UPDATE todo_totals SET n = n - 1
+        WHERE is_completed = old.is_completed AND priority = IFNULL(old.priority, '');
+        INSERT INTO todo_totals VALUES (new.is_completed, IFNULL(new.priority, ''), 1)
+        ON CONFLICT DO UPDATE SET n = n + 1;
+        UPDATE todo_open_due SET n = n - 1 WHERE due_ord = old.due_ord AND old.is_completed = 0;
+        INSERT INTO todo_open_due SELECT new.due_ord, 1 WHERE new.is_completed = 0
+        ON CONFLICT DO UPDATE SET n = n + 1;
+    END
+    """,
+)
+STATS_REBUILD = (
+    "DELETE FROM todo_totals",
+    "DELETE FROM todo_open_due",
+    "INSERT INTO todo_totals SELECT is_completed, IFNULL(priority, ''), COUNT(*) FROM todos GROUP BY 1, 2",
+    "INSERT INTO todo_open_due SELECT due_ord, COUNT(*) FROM todos WHERE is_completed = 0 GROUP BY 1",
+)
+SELECT_TOTALS = "SELECT is_completed, priority, n FROM todo_totals WHERE n > 0"
+SELECT_OPEN_DUE = "SELECT due_ord, n FROM todo_open_due WHERE n > 0"
+
+COLUMNS = "id, title, description, is_completed, created_at, due_date, priority"
+SELECT_ONE = f"SELECT {COLUMNS} FROM todos WHERE id = ?"
+SELECT_ALL = f"SELECT {COLUMNS} FROM todos ORDER BY created_at, id"
+INSERT = (
+    "INSERT INTO todos (id, title, description, is_completed, created_at, due_date, due_ord, priority) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+UPDATE = (
+    "UPDATE todos SET title = ?, description = ?, is_completed = ?, due_date = ?, due_ord = ?, priority = ? "
+    "WHERE id = ?"
+)
+DELETE = "DELETE FROM todos WHERE id = ?"
+SEARCH_COUNT = "SELECT COUNT(*) FROM todos_fts WHERE todos_fts MATCH ?"
+SEARCH = (
+    "SELECT t.id, t.title, t.description, t.is_completed, t.created_at, t.due_date, t.priority "
+    "FROM todos_fts JOIN todos t ON t.rowid = todos_fts.rowid WHERE todos_fts MATCH ? "
+    f"ORDER BY bm25(todos_fts, {TITLE_WEIGHT:.1f}, {DESCRIPTION_WEIGHT:.1f}), t.id LIMIT ? OFFSET ?"
+)
+
+
+def sqlite_path(database_url: str) -> Optional[str]:
+    """Filesystem path of a sqlite:/// URL, or None for an in-memory database."""
+    if database_url in ("sqlite://", "sqlite:///:memory:"):
+        return None
+    if not database_url.startswith("sqlite:///"):
+        raise ValueError(f"Unsupported DATABASE_URL: {database_url}")
+    return database_url[len("sqlite:///"):]
+
+
+def _match_expression(query: str) -> Optional[str]:
+    """FTS5 query requiring every term, each also matching as a prefix."""
+    terms = [
+        f'"{term}"*' if len(term) >= MIN_PREFIX_LENGTH else f'"{term}"'
+        for term in dict.fromkeys(tokenize(query))
+    ]
+    return " ".join(terms) or None
+
+
+def _due_ord(due_date: Optional[str]) -> int:
+    return date.fromisoformat(due_date).toordinal() if due_date else UNDATED_ORD
+
+
+def _row_to_dict(row: Tuple) -> Dict[str, Any]:
+    return {
+        "id": row[0],
+        "title": row[1],
+        "description": row[2],
+        "is_completed": bool(row[3]),
+        "created_at": row[4],
+        "due_date": row[5],
+        "priority": row[6],
+    }
+
+
+@lru_cache(maxsize=None)
+def _query_sql(
+    sort_by: str,
+    descending: bool,
+    completed: bool,
+    priority: bool,
+    due_range: bool,
+    after: bool
+) -> Tuple[str, str]:
+    """COUNT and page SQL for one filter shape.
+
+    Only the shape decides the text, never the values, so each variant is
+    built once and then served from sqlite3's prepared statement cache.
+    """
+    where = []
+    if completed:
+        where.append("is_completed = ?")
+    if priority:
+        where.append("priority IN (SELECT value FROM json_each(?))")
+    if due_range:
+        where.append("due_ord >= ? AND due_ord < ?")
+    clause = f" WHERE {' AND '.join(where)}" if where else ""
+
+    column = SORT_COLUMNS[sort_by]
+    page_where = list(where)
+    if after:
+        page_where.append(f"({column}, id) {'<' if descending else '>'} (?, ?)")
+    page_clause = f" WHERE {' AND '.join(page_where)}" if page_where else ""
+    direction = "DESC" if descending else "ASC"
+
+    count_sql = f"SELECT COUNT(*) FROM todos{clause}"
+    page_sql = (
+        f"SELECT {COLUMNS} FROM todos{page_clause} "
+        f"ORDER BY {column} {direction}, id {direction} LIMIT ? OFFSET ?"
+    )
+    return count_sql, page_sql
+
+
+class SqliteToDoRepo:
+    """ToDoRepo stored in SQLite, for data that survives restarts and is
+    shared by several uvicorn workers.
+
+    Each thread gets its own connection in WAL mode, so readers never
+    wait for the writer. Filtering, sorting and paging run in SQL on the
+    indexes above; statements use fixed SQL text and hit the
+    connection's statement cache. Stats are read from trigger-maintained
+    aggregate tables, whose size depends on the number of distinct open
+    due dates rather than on the number of todos.
+
+    With ``transactional_outbox`` the outbox_messages table lives in the
+    same database and each change writes its event there in its own
+    transaction, so a change is never committed without its event.
+    ``self.outbox`` reads that table for OutboxRelay. Otherwise events go
+    to the unit of work once the change has committed.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        event_producer: EventProducer,
+        unit_of_work: Optional[UnitOfWork] = None,
+        transactional_outbox: bool = False,
+        statement_cache_size: int = 128
+    ):
+        path = sqlite_path(database_url)
+        self._in_memory = path is None
+        # A named shared-cache database keeps one in-memory store for every thread.
+        self._target = f"file:{path}" if path else f"file:todos-{uuid4().hex}?mode=memory&cache=shared"
+        # SQLite has a single writer anyway. Queuing this process's writers
+        # here is cheaper than spinning on busy_timeout, and shared-cache
+        # databases fail with "table is locked" instead of waiting at all.
+        self._write_lock = threading.Lock()
+        self._statement_cache_size = statement_cache_size
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []
+        self.event_producer = event_producer
+        self.unit_of_work = unit_of_work or UnitOfWork(event_producer)
+
+        connection = self._connection()
+        for statement in SCHEMA:
+            connection.execute(statement)
+        has_search = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'todos_fts'"
+        ).fetchone() is not None
+        for statement in SEARCH_SCHEMA:
+            connection.execute(statement)
+        if not has_search:
+            # Databases created before search existed need their rows indexed once.
+            connection.execute("INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')")
+        has_stats = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'todo_totals'"
+        ).fetchone() is not None
+        if not has_stats:
+            with self._write() as writer:
+                for statement in STATS_SCHEMA + STATS_REBUILD:
+                    writer.execute(statement)
+        self.outbox = Outbox(database_url, creator=self._open) if transactional_outbox else None
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        return [_row_to_dict(row) for row in self._connection().execute(SELECT_ALL)]
+
+    def query(
+        self,
+        filters: Filter,
+        sort_by: str,
+        descending: bool,
+        offset: int,
+        limit: int,
+        after: Optional[IndexEntry] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort_by}")
+        params: List[Any] = []
+        if filters.completed is not None:
+            params.append(int(filters.completed))
+        if filters.priority:
+            params.append("[" + ",".join(f'"{priority.value}"' for priority in filters.priority) + "]")
+        due_range = bool(filters.due_before or filters.due_after)
+        if due_range:
+            params.append(filters.due_after.toordinal() if filters.due_after else 0)
+            params.append(filters.due_before.toordinal() + 1 if filters.due_before else UNDATED_ORD)
+
+        count_sql, page_sql = _query_sql(
+            sort_by,
+            descending,
+            filters.completed is not None,
+            bool(filters.priority),
+            due_range,
+            after is not None
+        )
+        page_params = list(params)
+        if after is not None:
+            (flag, value), todo_id = after
+            if sort_by == "due_date" and flag:
+                value = UNDATED_ORD
+            elif sort_by == "created_at":
+                # Cursor keys carry epoch microseconds; the column holds the ISO text.
+                value = format_timestamp(value)
+            page_params.extend([value, str(todo_id)])
+        page_params.extend([limit, offset])
+
+        connection = self._connection()
+        total = connection.execute(count_sql, params).fetchone()[0]
+        rows = connection.execute(page_sql, page_params).fetchall()
+        return total, [_row_to_dict(row) for row in rows]
+
+    def search(self, query: str, offset: int, limit: int) -> Tuple[int, List[Dict[str, Any]]]:
+        expression = _match_expression(query)
+        if expression is None:
+            return 0, []
+        connection = self._connection()
+        total = connection.execute(SEARCH_COUNT, (expression,)).fetchone()[0]
+        rows = connection.execute(SEARCH, (expression, limit, offset)).fetchall()
+        return total, [_row_to_dict(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        connection = self._connection()
+        # One snapshot for both reads, so the counts agree with each other.
+        connection.execute("BEGIN")
+        try:
+            totals = connection.execute(SELECT_TOTALS).fetchall()
+            open_by_due = connection.execute(SELECT_OPEN_DUE).fetchall()
+        finally:
+            connection.execute("COMMIT")
+
+        by_priority = dict.fromkeys(PRIORITIES[1:], 0)
+        total = completed = 0
+        for is_completed, priority, count in totals:
+            total += count
+            if is_completed:
+                completed += count
+            if priority in by_priority:
+                by_priority[priority] += count
+        due = sum_due_buckets(
+            ((NO_DUE_DATE if due_ord == UNDATED_ORD else due_ord, count) for due_ord, count in open_by_due),
+            date.today().toordinal()
+        )
+        return stats_dict(total, completed, by_priority, due)
+
+    def get_by_id(self, todo_id: UUID) -> Dict[str, Any]:
+        row = self._connection().execute(SELECT_ONE, (str(todo_id),)).fetchone()
+        if row is None:
+            raise FoundError(detail=f"ToDo with id {todo_id} not found, pls check your id")
+        return _row_to_dict(row)
+
+    def create(self, todo_data: Create) -> Dict[str, Any]:
+        todo_dict = {
+            "id": str(uuid4()),
+            "title": todo_data.title,
+            "description": todo_data.description,
+            "is_completed": False,
+            "created_at": datetime.utcnow().strftime(TIMESTAMP_FORMAT),
+            "due_date": todo_data.due_date.isoformat() if todo_data.due_date else None,
+            "priority": todo_data.priority.value if todo_data.priority else None
+        }
+        with self._write() as connection:
+            connection.execute(INSERT, (
+                todo_dict["id"],
+                todo_dict["title"],
+                todo_dict["description"],
+                0,
+                todo_dict["created_at"],
+                todo_dict["due_date"],
+                _due_ord(todo_dict["due_date"]),
+                todo_dict["priority"]
+            ))
+            self._emit(connection, "todo_created", todo_dict)
+
+        return todo_dict
+
+    def update(self, todo_id: UUID, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._write() as connection:
+            row = connection.execute(SELECT_ONE, (str(todo_id),)).fetchone()
+            if row is None:
+                raise FoundError(detail=f"ToDo with id {todo_id} not found")
+            existing = _row_to_dict(row)
+
+            for field, value in update_data.items():
+                if field == "due_date" and value is not None:
+                    existing["due_date"] = value.isoformat()
+                elif field == "priority" and value is not None:
+                    existing["priority"] = value.value
+                else:
+                    existing[field] = value
+
+            connection.execute(UPDATE, (
+                existing["title"],
+                existing["description"],
+                int(bool(existing["is_completed"])),
+                existing["due_date"],
+                _due_ord(existing["due_date"]),
+                existing["priority"],
+                existing["id"]
+            ))
+            self._emit(connection, "todo_updated", existing)
+
+        return existing
+
+    def delete(self, todo_id: UUID) -> None:
+        with self._write() as connection:
+            if connection.execute(DELETE, (str(todo_id),)).rowcount == 0:
+                raise FoundError(detail=f"ToDo with id {todo_id} not found")
+            self._emit(connection, "todo_deleted", {"id": str(todo_id)})
+
+    def close(self) -> None:
+        if self.outbox is not None:
+            self.outbox.engine.dispose()
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front, so a read-modify-write
+        # cannot interleave with another writer.
+        connection = self._connection()
+        with self._write_lock:
+            self._pending = []
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                connection.execute("COMMIT")
+            except Exception:
+                # Also after a failed COMMIT (SQLITE_BUSY, a full disk), which
+                # would otherwise leave this thread's connection mid-transaction.
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            events, self._pending = self._pending, []
+        for event_type, payload in events:
+            self.unit_of_work.record(event_type, payload)
+
+    def _emit(self, connection: sqlite3.Connection, event_type: str, payload: Dict[str, Any]) -> None:
+        # Called inside _write: the outbox row commits or rolls back with the change.
+        if self.outbox is not None:
+            connection.execute(INSERT_MESSAGE, message_row(event_type, payload))
+        else:
+            self._pending.append((event_type, payload))
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._open(isolation_level=None)
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _open(self, isolation_level: Optional[str] = "DEFERRED") -> sqlite3.Connection:
+        # The default suits the outbox's SQLAlchemy engine, which relies on
+        # the driver to open transactions; the repository manages its own.
+        connection = sqlite3.connect(
+            self._target,
+            uri=True,
+            isolation_level=isolation_level,
+            check_same_thread=False,
+            cached_statements=self._statement_cache_size
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=5000")
+        if self._in_memory:
+            # Shared-cache readers would otherwise fail while a write is open.
+            connection.execute("PRAGMA read_uncommitted=1")
+        return connection
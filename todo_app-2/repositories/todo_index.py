@@ -0,0 +1,172 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from models.todo_models import Filter
+from repositories.todo_record import PRIORITY_CODES, NO_DUE_DATE, TodoRecord, parse_timestamp
+
+SORT_FIELDS = ("created_at", "due_date")
+
+# Todos without a due date sort after every dated one, like date.max did before.
+_DATED = 0
+_UNDATED = 1
+
+IndexKey = Tuple[int, Any]
+IndexEntry = Tuple[IndexKey, UUID]
+# Inside the index todos are identified by their 16 id bytes, which sort
+# the same way as the UUIDs themselves.
+TodoId = bytes
+
+
+def due_key(due_date: Optional[str]) -> IndexKey:
+    if due_date is None:
+        return (_UNDATED, 0)
+    return (_DATED, date.fromisoformat(due_date).toordinal())
+
+
+def created_key(created_at: str) -> IndexKey:
+    return (_DATED, parse_timestamp(created_at))
+
+
+def sort_key(sort_by: str, todo: Dict[str, Any]) -> IndexKey:
+    if sort_by == "due_date":
+        return due_key(todo["due_date"])
+    return created_key(todo["created_at"])
+
+
+class TodoIndex:
+    """Secondary indexes over the todo storage.
+
+    Keeps per-priority and per-completion buckets of ids plus sorted
+    (key, id) lists for every sortable field, so a filtered and sorted
+    page can be answered without looking at non-matching todos.
+    """
+
+    def __init__(self):
+        self._by_priority: Dict[int, Set[TodoId]] = {}
+        self._by_completed: Dict[bool, Set[TodoId]] = {True: set(), False: set()}
+        self._sorted: Dict[str, List[Tuple[IndexKey, TodoId]]] = {field: [] for field in SORT_FIELDS}
+        self._keys: Dict[str, Dict[TodoId, IndexKey]] = {field: {} for field in SORT_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self._keys["created_at"])
+
+    def add(self, todo: TodoRecord) -> None:
+        todo_id = todo.id
+        self._by_priority.setdefault(todo.priority, set()).add(todo_id)
+        self._by_completed[todo.is_completed].add(todo_id)
+        for field, key in self._sort_keys(todo).items():
+            self._keys[field][todo_id] = key
+            insort(self._sorted[field], (key, todo_id))
+
+    def remove(self, todo: TodoRecord) -> None:
+        todo_id = todo.id
+        bucket = self._by_priority.get(todo.priority)
+        if bucket is not None:
+            bucket.discard(todo_id)
+            if not bucket:
+                del self._by_priority[todo.priority]
+        self._by_completed[todo.is_completed].discard(todo_id)
+        for field in SORT_FIELDS:
+            key = self._keys[field].pop(todo_id)
+            entries = self._sorted[field]
+            del entries[bisect_left(entries, (key, todo_id))]
+
+    def candidates(self, filters: Filter) -> Optional[Set[TodoId]]:
+        """Ids matching ``filters``, or None when nothing is filtered."""
+        sets: List[Set[TodoId]] = []
+
+        if filters.completed is not None:
+            sets.append(self._by_completed[filters.completed])
+
+        if filters.priority:
+            matched: Set[TodoId] = set()
+            for priority in filters.priority:
+                matched |= self._by_priority.get(PRIORITY_CODES[priority.value], set())
+            sets.append(matched)
+
+        if filters.due_before or filters.due_after:
+            sets.append(set(self._due_range(filters.due_after, filters.due_before)))
+
+        if not sets:
+            return None
+
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def page(
+        self,
+        sort_by: str,
+        descending: bool,
+        candidates: Optional[Set[TodoId]],
+        offset: int,
+        limit: int,
+        after: Optional[Tuple[IndexKey, TodoId]] = None
+    ) -> List[TodoId]:
+        """Ids of one page in sort order.
+
+        ``after`` is a keyset cursor: the page starts right past that
+        (key, id) entry, found by bisection instead of counting ``offset``.
+        """
+        entries = self._sorted[sort_by]
+        start, end = 0, len(entries)
+        if after is not None:
+            if descending:
+                end = bisect_left(entries, after)
+            else:
+                start = bisect_right(entries, after)
+
+        if candidates is None:
+            if descending:
+                stop = max(end - offset, start)
+                return [todo_id for _, todo_id in reversed(entries[max(stop - limit, start):stop])]
+            first = start + offset
+            return [todo_id for _, todo_id in entries[first:min(first + limit, end)]]
+
+        wanted = offset + limit
+        # A small candidate set is cheaper to rank directly than to find by
+        # walking the whole sorted index.
+        if len(candidates) * 4 <= end - start:
+            keys = self._keys[sort_by]
+            ranked = ((keys[todo_id], todo_id) for todo_id in candidates)
+            if after is not None:
+                ranked = (entry for entry in ranked if (entry < after if descending else entry > after))
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            return [todo_id for _, todo_id in pick(wanted, ranked)[offset:]]
+
+        positions = range(end - 1, start - 1, -1) if descending else range(start, end)
+        result: List[TodoId] = []
+        skipped = 0
+        for position in positions:
+            todo_id = entries[position][1]
+            if todo_id not in candidates:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            result.append(todo_id)
+            if len(result) >= limit:
+                break
+        return result
+
+    def _due_range(self, after: Optional[date], before: Optional[date]) -> Iterable[TodoId]:
+        entries = self._sorted["due_date"]
+        low = (_DATED, after.toordinal()) if after else (_DATED, 0)
+        high = (_DATED, before.toordinal() + 1) if before else (_UNDATED, 0)
+        start = bisect_left(entries, (low,))
+        end = bisect_left(entries, (high,))
+        return (todo_id for _, todo_id in entries[start:end])
+
+    @staticmethod
+    def _sort_keys(todo: TodoRecord) -> Dict[str, IndexKey]:
+        return {
+            "created_at": (_DATED, todo.created_at),
+            "due_date": (_UNDATED, 0) if todo.due_ord == NO_DUE_DATE else (_DATED, todo.due_ord),
+        }
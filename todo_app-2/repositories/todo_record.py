@@ -0,0 +1,110 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+from uuid import UUID, uuid4
+
+from models.enums import PriorityEnum
+
+# Priorities are stored as their position here; 0 means "no priority".
+PRIORITIES = (None,) + tuple(priority.value for priority in PriorityEnum)
+PRIORITY_CODES = {value: code for code, value in enumerate(PRIORITIES)}
+
+NO_DUE_DATE = 0
+
+# Always six fractional digits, so timestamps as text sort in time order:
+# isoformat() drops the fraction when it is zero.
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(moment: datetime) -> int:
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def parse_timestamp(value: str) -> int:
+    """Microseconds since the epoch of a ``...Z`` ISO timestamp."""
+    return to_micros(datetime.fromisoformat(value.rstrip("Z")))
+
+
+def format_timestamp(micros: int) -> str:
+    return (_EPOCH + timedelta(microseconds=micros)).strftime(TIMESTAMP_FORMAT)
+
+
+class TodoRecord:
+    """One stored todo, without the per-item dict.
+
+    The id is kept as its 16 raw bytes, the priority as a small int code,
+    the creation time as epoch microseconds and the due date as a date
+    ordinal (0 when there is none). ``to_dict`` rebuilds the API shape
+    and is only called when a todo leaves the repository.
+    """
+
+    __slots__ = ("id", "title", "description", "is_completed", "created_at", "due_ord", "priority")
+
+    def __init__(
+        self,
+        id: bytes,
+        title: str,
+        description: Optional[str],
+        is_completed: bool,
+        created_at: int,
+        due_ord: int,
+        priority: int
+    ):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.is_completed = is_completed
+        self.created_at = created_at
+        self.due_ord = due_ord
+        self.priority = priority
+
+    @classmethod
+    def new(cls, title: str, description: Optional[str], due_date: Optional[date], priority: Optional[PriorityEnum]) -> "TodoRecord":
+        return cls(
+            uuid4().bytes,
+            title,
+            description,
+            False,
+            to_micros(datetime.utcnow()),
+            due_date.toordinal() if due_date else NO_DUE_DATE,
+            PRIORITY_CODES[priority.value] if priority else 0
+        )
+
+    def copy(self) -> "TodoRecord":
+        return TodoRecord(
+            self.id,
+            self.title,
+            self.description,
+            self.is_completed,
+            self.created_at,
+            self.due_ord,
+            self.priority
+        )
+
+    @property
+    def uuid(self) -> UUID:
+        return UUID(bytes=self.id)
+
+    def apply(self, update_data: Dict[str, Any]) -> None:
+        for field, value in update_data.items():
+            if field == "due_date":
+                self.due_ord = value.toordinal() if value else NO_DUE_DATE
+            elif field == "priority":
+                self.priority = PRIORITY_CODES[value.value] if value else 0
+            elif field == "is_completed":
+                self.is_completed = bool(value)
+            else:
+                setattr(self, field, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": str(UUID(bytes=self.id)),
+            "title": self.title,
+            "description": self.description,
+            "is_completed": self.is_completed,
+            "created_at": format_timestamp(self.created_at),
+            "due_date": date.fromordinal(self.due_ord).isoformat() if self.due_ord else None,
+            "priority": PRIORITIES[self.priority]
+        }
@@ -1,68 +1,139 @@
-from typing import List, Dict, Any
-from uuid import UUID, uuid4 
-from datetime import datetime
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from uuid import UUID
 
-from models.todo_models import Create
+from models.todo_models import Create, Filter
 from common.exceptions import FoundError
 from events.event_producer import EventProducer
+from events.outbox import Outbox
+from events.unit_of_work import UnitOfWork
+from repositories.todo_index import TodoIndex, IndexEntry
+from repositories.todo_record import TodoRecord
+from repositories.search_index import SearchIndex
+from repositories.todo_stats import TodoStats
 
 
 class ToDoRepo:
-    def __init__(self, event_producer: EventProducer):
-        self._storage: Dict[UUID, Dict[str, Any]] = {}
+    """In-memory todo storage, safe to share between request threads.
+
+    Records are never changed once stored: an update stores a modified
+    copy. A striped per-id lock serialises writers of the same todo for
+    their read-modify-write, and one short index lock covers the storage
+    dict, the indexes and the stats, so a reader always sees a consistent snapshot
+    of them and turns its records into dicts after releasing it.
+    """
+
+    def __init__(
+        self,
+        event_producer: EventProducer,
+        outbox: Optional[Outbox] = None,
+        unit_of_work: Optional[UnitOfWork] = None,
+        lock_stripes: int = 64
+    ):
+        # Keyed by the 16 id bytes; records become dicts only on the way out.
+        self._storage: Dict[bytes, TodoRecord] = {}
+        self._index = TodoIndex()
+        self._search = SearchIndex()
+        self._stats = TodoStats()
+        self._index_lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(lock_stripes)]
         self.event_producer = event_producer
+        self.outbox = outbox
+        self.unit_of_work = unit_of_work or UnitOfWork(event_producer, outbox)
 
     def get_all(self) -> List[Dict[str, Any]]:
-        return list(self._storage.values())
+        with self._index_lock:
+            records = list(self._storage.values())
+        return [record.to_dict() for record in records]
+
+    def query(
+        self,
+        filters: Filter,
+        sort_by: str,
+        descending: bool,
+        offset: int,
+        limit: int,
+        after: Optional[IndexEntry] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        if after is not None:
+            after = (after[0], after[1].bytes)
+        with self._index_lock:
+            candidates = self._index.candidates(filters)
+            total = len(self._storage) if candidates is None else len(candidates)
+            page_ids = self._index.page(sort_by, descending, candidates, offset, limit, after)
+            records = [self._storage[todo_id] for todo_id in page_ids]
+        return total, [record.to_dict() for record in records]
+
+    def search(self, query: str, offset: int, limit: int) -> Tuple[int, List[Dict[str, Any]]]:
+        with self._index_lock:
+            total, page_ids = self._search.search(query, offset, limit)
+            records = [self._storage[todo_id] for todo_id in page_ids]
+        return total, [record.to_dict() for record in records]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._index_lock:
+            return self._stats.snapshot()
 
     def get_by_id(self, todo_id: UUID) -> Dict[str, Any]:
-        if todo_id not in self._storage:
+        record = self._storage.get(todo_id.bytes)
+        if record is None:
             raise FoundError(detail=f"ToDo with id {todo_id} not found, pls check your id")
-        return self._storage[todo_id]
+        return record.to_dict()
 
     def create(self, todo_data: Create) -> Dict[str, Any]:
-        new_id = uuid4() 
-        now = datetime.utcnow()
-
-        todo_dict = {
-            "id": str(new_id),
-            "title": todo_data.title,
-            "description": todo_data.description,
-            "is_completed": False,
-            "created_at": now.isoformat() + "Z",
-            "due_date": todo_data.due_date.isoformat() if todo_data.due_date else None,
-            "priority": todo_data.priority.value if todo_data.priority else None
-        }
-        self._storage[new_id] = todo_dict
-        
-        self.event_producer.send_event("todo_created", todo_dict)
+        record = TodoRecord.new(
+            todo_data.title,
+            todo_data.description,
+            todo_data.due_date,
+            todo_data.priority
+        )
+        with self._index_lock:
+            self._storage[record.id] = record
+            self._index.add(record)
+            self._stats.add(record)
+            self._search.add(record.id, record.title, record.description)
+
+        todo_dict = record.to_dict()
+        self.unit_of_work.record("todo_created", todo_dict)
         
         return todo_dict
 
     def update(self, todo_id: UUID, update_data: Dict[str, Any]) -> Dict[str, Any]:
-        if todo_id not in self._storage:
-            raise FoundError(detail=f"ToDo with id {todo_id} not found")
-        existing = self._storage[todo_id]
-
-        for field, value in update_data.items():
-            if field == "due_date" and value is not None:
-                existing["due_date"] = value.isoformat()
-            elif field == "priority" and value is not None:
-                existing["priority"] = value.value
-            else:
-                existing[field] = value
-
-        self._storage[todo_id] = existing
-        
+        with self._stripe(todo_id):
+            current = self._storage.get(todo_id.bytes)
+            if current is None:
+                raise FoundError(detail=f"ToDo with id {todo_id} not found")
+            record = current.copy()
+            record.apply(update_data)
+            with self._index_lock:
+                self._storage[record.id] = record
+                self._index.remove(current)
+                self._index.add(record)
+                self._stats.remove(current)
+                self._stats.add(record)
+                if "title" in update_data or "description" in update_data:
+                    self._search.add(record.id, record.title, record.description)
 
-        self.event_producer.send_event("todo_updated", existing)
+        todo_dict = record.to_dict()
+        self.unit_of_work.record("todo_updated", todo_dict)
 
-        return existing
+        return todo_dict
 
     def delete(self, todo_id: UUID) -> None:
-        if todo_id not in self._storage:
-            raise FoundError(detail=f"ToDo with id {todo_id} not found")
-        del self._storage[todo_id]
-        
+        with self._stripe(todo_id), self._index_lock:
+            record = self._storage.pop(todo_id.bytes, None)
+            if record is None:
+                raise FoundError(detail=f"ToDo with id {todo_id} not found")
+            self._index.remove(record)
+            self._stats.remove(record)
+            self._search.remove(record.id)
+
+        self.unit_of_work.record("todo_deleted", {"id": str(todo_id)})
+
+    def close(self) -> None:
+        # The todos live as long as the process; only the outbox holds connections.
+        if self.outbox is not None:
+            self.outbox.engine.dispose()
 
-        self.event_producer.send_event("todo_deleted", {"id": str(todo_id)})
\ No newline at end of file
+    def _stripe(self, todo_id: UUID) -> threading.Lock:
+        return self._stripes[todo_id.int % len(self._stripes)]
\ No newline at end of file
@@ -0,0 +1,89 @@
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from repositories.todo_record import PRIORITIES, NO_DUE_DATE, TodoRecord
+
+# Due buckets count open todos only, relative to "today".
+DUE_BUCKETS = ("overdue", "today", "this_week", "later", "no_due_date")
+WEEK_DAYS = 7
+
+
+def due_bucket(due_ord: int, today: int) -> str:
+    if due_ord == NO_DUE_DATE:
+        return "no_due_date"
+    if due_ord < today:
+        return "overdue"
+    if due_ord == today:
+        return "today"
+    if due_ord <= today + WEEK_DAYS:
+        return "this_week"
+    return "later"
+
+
+def sum_due_buckets(open_by_due: Iterable[Tuple[int, int]], today: int) -> Dict[str, int]:
+    due = dict.fromkeys(DUE_BUCKETS, 0)
+    for due_ord, count in open_by_due:
+        due[due_bucket(due_ord, today)] += count
+    return due
+
+
+def stats_dict(total: int, completed: int, by_priority: Dict[str, int], due: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "total": total,
+        "completed": completed,
+        "open": total - completed,
+        "by_priority": by_priority,
+        "due": due
+    }
+
+
+class TodoStats:
+    """Running aggregates over the stored todos.
+
+    ``add`` and ``remove`` mirror TodoIndex and adjust a few counters, so
+    reading the stats never looks at the todos themselves. Open todos are
+    also counted per due date; the due buckets are derived from those
+    counts once per day and then kept current by the same updates.
+    """
+
+    def __init__(self):
+        self._total = 0
+        self._completed = 0
+        self._by_priority = [0] * len(PRIORITIES)
+        self._open_by_due: Dict[int, int] = {}
+        self._today: Optional[int] = None
+        self._due: Dict[str, int] = {}
+
+    def add(self, todo: TodoRecord) -> None:
+        self._count(todo, 1)
+
+    def remove(self, todo: TodoRecord) -> None:
+        self._count(todo, -1)
+
+    def snapshot(self, today: Optional[date] = None) -> Dict[str, Any]:
+        today_ord = (today or date.today()).toordinal()
+        if today_ord != self._today:
+            self._rebuild_due(today_ord)
+        by_priority = {
+            priority: count
+            for priority, count in zip(PRIORITIES[1:], self._by_priority[1:])
+        }
+        return stats_dict(self._total, self._completed, by_priority, dict(self._due))
+
+    def _count(self, todo: TodoRecord, delta: int) -> None:
+        self._total += delta
+        self._by_priority[todo.priority] += delta
+        if todo.is_completed:
+            self._completed += delta
+            return
+        remaining = self._open_by_due.get(todo.due_ord, 0) + delta
+        if remaining:
+            self._open_by_due[todo.due_ord] = remaining
+        else:
+            del self._open_by_due[todo.due_ord]
+        if self._today is not None:
+            self._due[due_bucket(todo.due_ord, self._today)] += delta
+
+    def _rebuild_due(self, today: int) -> None:
+        self._due = sum_due_buckets(self._open_by_due.items(), today)
+        self._today = today
@@ -0,0 +1,72 @@
+from typing import Any, Dict, Tuple
+from uuid import UUID
+from fastapi import Depends, Path
+from fastapi.responses import ORJSONResponse
+
+from models.todo_models import Create, Update, Pagination
+from services.async_todo_service import AsyncToDoService
+from repositories.factory import create_todo_repository
+from repositories.async_todo_repository import AsyncToDoRepo
+from events.event_producer import EventProducer
+from events.async_event_producer import AsyncEventProducer
+from events.unit_of_work import AsyncUnitOfWork
+from routers.todo_api import (
+    LIST_ROUTE, SEARCH_ROUTE, STATS_ROUTE, GET_ROUTE, CREATE_ROUTE, UPDATE_ROUTE, DELETE_ROUTE,
+    create_router, list_query, search_query, created, no_content
+)
+
+
+router = create_router()
+
+event_producer = EventProducer()
+# Used instead of routers.todo_router when API_MODE=async (see main.py).
+async_event_producer = AsyncEventProducer(event_producer)
+todo_repository = create_todo_repository(
+    event_producer,
+    make_unit_of_work=lambda outbox: AsyncUnitOfWork(async_event_producer, outbox)
+)
+outbox = todo_repository.outbox
+todo_service = AsyncToDoService(AsyncToDoRepo(todo_repository))
+
+def close() -> None:
+    # Also closes event_producer, whose publisher the async producer shares.
+    async_event_producer.close()
+    todo_repository.close()
+
+@router.get("", **LIST_ROUTE)
+async def list_todos(query: Dict[str, Any] = Depends(list_query)):
+    return ORJSONResponse(await todo_service.list_todos(**query))
+
+@router.get("/search", **SEARCH_ROUTE)
+async def search_todos(query: Tuple[str, Pagination] = Depends(search_query)):
+    return ORJSONResponse(await todo_service.search_todos(*query))
+
+@router.get("/stats", **STATS_ROUTE)
+async def get_stats():
+    return ORJSONResponse(await todo_service.get_stats())
+
+@router.get("/{todo_id}", **GET_ROUTE)
+async def get_todo(
+    todo_id: UUID = Path(..., description="UUID of the ToDo")
+):
+    return ORJSONResponse(await todo_service.get_todo(todo_id))
+
+@router.post("", **CREATE_ROUTE)
+async def create_todo(
+    todo_create: Create
+):
+    return created(await todo_service.create_todo(todo_create))
+
+@router.put("/{todo_id}", **UPDATE_ROUTE)
+async def update_todo(
+    todo_id: UUID = Path(..., description="UUID of the ToDo to update"),
+    todo_update: Update = ...
+):
+    return ORJSONResponse(await todo_service.update_todo(todo_id, todo_update))
+
+@router.delete("/{todo_id}", **DELETE_ROUTE)
+async def delete_todo(
+    todo_id: UUID = Path(..., description="UUID of ToDo to delete")
+):
+    await todo_service.delete_todo(todo_id)
+    return no_content()
@@ -0,0 +1,101 @@
+"""
+Route declarations, request parsing and responses shared by
+routers.todo_router and routers.async_todo_router, which differ only in
+whether their handlers await the service.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Query, status
+from fastapi.responses import ORJSONResponse, Response
+
+from models.todo_models import (
+    Pagination, Filter, Error,
+    Todo, TodoPage, SearchPage, TodoStats
+)
+from common.settings import PAGE_SIZE_DEFAULT
+
+
+class ErrorResponse(Error):
+    pass
+
+PAGE_SIZE_MIN = 10
+
+# Keyword arguments of each route's decorator. Search and stats must be
+# declared before "/{todo_id}" so they are not parsed as todo ids.
+LIST_ROUTE = {
+    "response_model": TodoPage,
+    "responses": {400: {"model": ErrorResponse}, 422: {"model": ErrorResponse}}
+}
+SEARCH_ROUTE = {
+    "response_model": SearchPage,
+    "responses": {400: {"model": ErrorResponse}, 422: {"model": ErrorResponse}}
+}
+STATS_ROUTE = {
+    "response_model": TodoStats
+}
+GET_ROUTE = {
+    "response_model": Todo,
+    "responses": {400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}}
+}
+CREATE_ROUTE = {
+    "status_code": status.HTTP_201_CREATED,
+    "response_model": Todo,
+    "responses": {422: {"model": ErrorResponse}, 400: {"model": ErrorResponse}}
+}
+UPDATE_ROUTE = {
+    "response_model": Todo,
+    "responses": {400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 422: {"model": ErrorResponse}}
+}
+DELETE_ROUTE = {
+    "status_code": status.HTTP_204_NO_CONTENT,
+    "responses": {400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}}
+}
+
+
+def create_router() -> APIRouter:
+    # Routes return the service dicts as ORJSONResponse directly, so FastAPI
+    # skips response_model validation; the models only document the schema.
+    return APIRouter(prefix="/api/todos", tags=["ToDo"], default_response_class=ORJSONResponse)
+
+
+def list_query(
+    page: int = Query(1, ge=1),
+    size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; overrides page"),
+    is_completed: Optional[bool] = Query(None),
+    due_before: Optional[str] = Query(None),
+    due_after: Optional[str] = Query(None),
+    priority: Optional[List[str]] = Query(None),
+    sort_by: str = Query("created_at"),
+    order: str = Query("asc")
+) -> Dict[str, Any]:
+    """Keyword arguments for the service's list_todos."""
+    filters = Filter(
+        completed=is_completed,
+        due_before=due_before,
+        due_after=due_after,
+        priority=priority
+    )
+    return {
+        "pagination": Pagination(page=page, size=size, cursor=cursor),
+        "filters": filters,
+        "sort_by": sort_by,
+        "order": order
+    }
+
+
+def search_query(
+    q: str = Query(..., min_length=1, description="words to look for; each also matches as a prefix"),
+    page: int = Query(1, ge=1),
+    size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=100)
+) -> Tuple[str, Pagination]:
+    """Arguments for the service's search_todos."""
+    return q, Pagination(page=page, size=size)
+
+
+def created(todo: Dict[str, Any]) -> ORJSONResponse:
+    return ORJSONResponse(todo, status_code=status.HTTP_201_CREATED)
+
+
+def no_content() -> Response:
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,107 +1,63 @@
-from typing import List, Dict, Any, Optional
+from typing import Any, Dict, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, Query, Path, status
-from fastapi.responses import JSONResponse
+from fastapi import Depends, Path
+from fastapi.responses import ORJSONResponse
 
-from models.todo_models import (
-    Create, Update, 
-    Pagination, Filter, Error
-)
+from models.todo_models import Create, Update, Pagination
 from services.todo_service import ToDoService
-from repositories.todo_repository import ToDoRepo
-from common.settings import PAGE_SIZE_DEFAULT
+from repositories.factory import create_todo_repository
 from events.event_producer import EventProducer
+from routers.todo_api import (
+    LIST_ROUTE, SEARCH_ROUTE, STATS_ROUTE, GET_ROUTE, CREATE_ROUTE, UPDATE_ROUTE, DELETE_ROUTE,
+    create_router, list_query, search_query, created, no_content
+)
 
 
-router = APIRouter(prefix="/api/todos", tags=["ToDo"])
+router = create_router()
 
 event_producer = EventProducer()
-todo_repository = ToDoRepo(event_producer) 
+todo_repository = create_todo_repository(event_producer)
+outbox = todo_repository.outbox
 todo_service = ToDoService(repository=todo_repository, event_producer=event_producer)
 
-class ErrorResponse(Error):
-    pass
+def close() -> None:
+    event_producer.close()
+    todo_repository.close()
 
-PAGE_SIZE_MIN = 10
+@router.get("", **LIST_ROUTE)
+def list_todos(query: Dict[str, Any] = Depends(list_query)):
+    return ORJSONResponse(todo_service.list_todos(**query))
 
-@router.get(
-    "",
-    response_model=Dict[str, Any],
-    responses={400: {"model": ErrorResponse}, 422: {"model": ErrorResponse}}
-)
-def list_todos(
-    page: int = Query(1, ge=1),
-    size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=100),
-    is_completed: Optional[bool] = Query(None),
-    due_before: Optional[str] = Query(None),
-    due_after: Optional[str] = Query(None),
-    priority: Optional[List[str]] = Query(None),
-    sort_by: str = Query("created_at"),
-    order: str = Query("asc")
-):
-    filters = Filter(
-        completed=is_completed,
-        due_before=due_before,
-        due_after=due_after,
-        priority=priority
-    )
-    pagination = Pagination(page=page, size=size)
+@router.get("/search", **SEARCH_ROUTE)
+def search_todos(query: Tuple[str, Pagination] = Depends(search_query)):
+    return ORJSONResponse(todo_service.search_todos(*query))
 
-    result = todo_service.list_todos(
-        pagination=pagination,
-        filters=filters,
-        sort_by=sort_by,
-        order=order
-    )
-    return result
+@router.get("/stats", **STATS_ROUTE)
+def get_stats():
+    return ORJSONResponse(todo_service.get_stats())
 
-@router.get(
-    "/{todo_id}",
-    response_model=Dict[str, Any],
-    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}}
-)
+@router.get("/{todo_id}", **GET_ROUTE)
 def get_todo(
     todo_id: UUID = Path(..., description="UUID of the ToDo")
 ):
-    todo_dict = todo_service.get_todo(todo_id)
-    return todo_dict
+    return ORJSONResponse(todo_service.get_todo(todo_id))
 
-@router.post(
-    "",
-    status_code=status.HTTP_201_CREATED,
-    response_model=Dict[str, Any],
-    responses={422: {"model": ErrorResponse}, 400: {"model": ErrorResponse}}
-)
+@router.post("", **CREATE_ROUTE)
 def create_todo(
     todo_create: Create
 ):
-    created = todo_service.create_todo(todo_create)
-    return JSONResponse(
-        status_code=status.HTTP_201_CREATED,
-        content=created
-    )
+    return created(todo_service.create_todo(todo_create))
 
-@router.put(
-    "/{todo_id}",
-    response_model=Dict[str, Any],
-    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 422: {"model": ErrorResponse}}
-)
+@router.put("/{todo_id}", **UPDATE_ROUTE)
 def update_todo(
     todo_id: UUID = Path(..., description="UUID of the ToDo to update"),
     todo_update: Update = ...
 ):
-    updated = todo_service.update_todo(todo_id, todo_update)
-    event_producer.send_event("todo_updated", updated)  
-    return updated
+    return ORJSONResponse(todo_service.update_todo(todo_id, todo_update))
 
-@router.delete(
-    "/{todo_id}",
-    status_code=status.HTTP_204_NO_CONTENT,
-    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}}
-)
+@router.delete("/{todo_id}", **DELETE_ROUTE)
 def delete_todo(
     todo_id: UUID = Path(..., description="UUID of ToDo to delete")
 ):
     todo_service.delete_todo(todo_id)
-    event_producer.send_event("todo_deleted", {"id": str(todo_id)})  
-    return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content=None)
\ No newline at end of file
+    return no_content()
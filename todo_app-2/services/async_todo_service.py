@@ -0,0 +1,58 @@
+from typing import Any, Dict
+from uuid import UUID
+
+from models.todo_models import Create, Update, Pagination, Filter
+from repositories.async_todo_repository import AsyncToDoRepo
+from services.todo_service import listing_window, listing_page, validate_query, search_page, update_fields
+
+
+class AsyncToDoService:
+    """ToDoService for ``async def`` routes; same rules, awaitable I/O."""
+
+    def __init__(self, repository: AsyncToDoRepo):
+        self.repo = repository
+        self.unit_of_work = repository.unit_of_work
+
+    async def list_todos(
+        self,
+        pagination: Pagination,
+        filters: Filter,
+        sort_by: str = "created_at",
+        order: str = "asc"
+    ) -> Dict[str, Any]:
+        order, page, after = listing_window(pagination, sort_by, order)
+        size = pagination.size
+        total_items, items_page = await self.repo.query(
+            filters,
+            sort_by,
+            descending=order == "desc",
+            offset=(page - 1) * size if page else 0,
+            limit=size + 1,
+            after=after
+        )
+        return listing_page(total_items, items_page, size, page, sort_by, order)
+
+    async def search_todos(self, query: str, pagination: Pagination) -> Dict[str, Any]:
+        validate_query(query)
+        size = pagination.size
+        total_items, items = await self.repo.search(query, (pagination.page - 1) * size, size)
+        return search_page(query, total_items, items, pagination)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return await self.repo.stats()
+
+    async def get_todo(self, todo_id: UUID) -> Dict:
+        return await self.repo.get_by_id(todo_id)
+
+    async def create_todo(self, todo_data: Create) -> Dict:
+        async with self.unit_of_work.begin_async():
+            return await self.repo.create(todo_data)
+
+    async def update_todo(self, todo_id: UUID, update_data: Update) -> Dict:
+        update_dict = update_fields(update_data)
+        async with self.unit_of_work.begin_async():
+            return await self.repo.update(todo_id, update_dict)
+
+    async def delete_todo(self, todo_id: UUID) -> None:
+        async with self.unit_of_work.begin_async():
+            await self.repo.delete(todo_id)
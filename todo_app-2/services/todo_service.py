@@ -1,16 +1,110 @@
-from typing import List, Dict, Any
-from datetime import date
+import base64
+import binascii
+import json
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 
 from models.todo_models import Create, Update, Pagination, Filter
 from common.exceptions import ParameterError
 from repositories.todo_repository import ToDoRepo
+from repositories.todo_index import SORT_FIELDS, IndexEntry, sort_key
 from events.event_producer import EventProducer
 
+
+def encode_cursor(sort_by: str, order: str, entry: IndexEntry) -> str:
+    key, todo_id = entry
+    raw = json.dumps([sort_by, order, list(key), str(todo_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> IndexEntry:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, key, todo_id = json.loads(base64.urlsafe_b64decode(padded))
+        entry = (tuple(key), UUID(todo_id))
+        if len(entry[0]) != 2 or not all(isinstance(part, (int, str)) for part in entry[0]):
+            raise ValueError(key)
+    except (binascii.Error, ValueError, TypeError):
+        raise ParameterError(detail="cursor is malformed")
+    if cursor_sort != sort_by or cursor_order != order:
+        raise ParameterError(detail="cursor was issued for a different sort_by/order")
+    return entry
+
+
+def listing_window(pagination: Pagination, sort_by: str, order: str) -> Tuple[str, Optional[int], Optional[IndexEntry]]:
+    """Validated order, page number (None in cursor mode) and keyset cursor."""
+    if sort_by not in SORT_FIELDS:
+        raise ParameterError(detail="sort_by must be 'created_at' or 'due_date'")
+    order = order.lower()
+    after = decode_cursor(pagination.cursor, sort_by, order) if pagination.cursor else None
+    page: Optional[int] = None if after else pagination.page
+    return order, page, after
+
+
+def listing_page(
+    total_items: int,
+    items_page: List[Dict[str, Any]],
+    size: int,
+    page: Optional[int],
+    sort_by: str,
+    order: str
+) -> Dict[str, Any]:
+    """Response for a page fetched with ``size + 1`` rows."""
+    has_more = len(items_page) > size
+    if has_more:
+        del items_page[size:]
+
+    total_pages: Optional[int] = None
+    if page:
+        total_pages = (total_items + size - 1) // size if total_items > 0 else 1
+        if page > total_pages and total_items > 0:
+            raise ParameterError(detail=f"page {page} is out of range (total_pages={total_pages})")
+
+    next_cursor = None
+    if has_more:
+        last = items_page[-1]
+        next_cursor = encode_cursor(sort_by, order, (sort_key(sort_by, last), UUID(last["id"])))
+
+    return {
+        "page": page,
+        "size": size,
+        "total_items": total_items,
+        "total_pages": total_pages,
+        "items": items_page,
+        "next_cursor": next_cursor
+    }
+
+
+def validate_query(query: str) -> None:
+    if not query or not query.strip():
+        raise ParameterError(detail="query must not be empty")
+
+
+def search_page(query: str, total_items: int, items: List[Dict[str, Any]], pagination: Pagination) -> Dict[str, Any]:
+    size = pagination.size
+    return {
+        "query": query,
+        "page": pagination.page,
+        "size": size,
+        "total_items": total_items,
+        "total_pages": (total_items + size - 1) // size if total_items > 0 else 1,
+        "items": items
+    }
+
+
+def update_fields(update_data: Update) -> Dict[str, Any]:
+    update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
+    if not update_dict:
+        raise ParameterError(detail="No fields provided for update")
+    return update_dict
+
+
 class ToDoService:
     def __init__(self, repository: ToDoRepo, event_producer: EventProducer):
         self.repo = repository
         self.event_producer = event_producer
+        # The repository records events; they are published once per operation.
+        self.unit_of_work = repository.unit_of_work
 
     def list_todos(
         self,
@@ -19,71 +113,40 @@ class ToDoService:
         sort_by: str = "created_at",
         order: str = "asc"
     ) -> Dict[str, Any]:
-        todos = self.repo.get_all()
-
-        todos_filtered = []
-        for item in todos:
-            if filters.completed is not None and item["is_completed"] != filters.completed:
-                continue
-
-            if filters.due_before:
-                if item["due_date"] is None or item["due_date"] > filters.due_before:
-                    continue
-
-            if filters.due_after:
-                if item["due_date"] is None or item["due_date"] < filters.due_after:
-                    continue
-
-            if filters.priority and item["priority"] not in filters.priority:
-                continue
-
-            todos_filtered.append(item)
-
-        if sort_by not in ("created_at", "due_date"):
-            raise ParameterError(detail="sort_by must be 'created_at' or 'due_date'")
-
-        reverse_flag = order.lower() == "desc"
-        todos_filtered.sort(
-            key=lambda x: x.get(sort_by) or date.max,
-            reverse=reverse_flag
+        order, page, after = listing_window(pagination, sort_by, order)
+        size = pagination.size
+        # One extra row tells whether another page follows without counting.
+        total_items, items_page = self.repo.query(
+            filters,
+            sort_by,
+            descending=order == "desc",
+            offset=(page - 1) * size if page else 0,
+            limit=size + 1,
+            after=after
         )
+        return listing_page(total_items, items_page, size, page, sort_by, order)
 
-        page = pagination.page
+    def search_todos(self, query: str, pagination: Pagination) -> Dict[str, Any]:
+        validate_query(query)
         size = pagination.size
-        total_items = len(todos_filtered)
-        total_pages = (total_items + size - 1) // size if total_items > 0 else 1
-
-        if page > total_pages and total_items > 0:
-            raise ParameterError(detail=f"page {page} is out of range (total_pages={total_pages})")
-
-        start = (page - 1) * size
-        end = start + size
-        items_page = todos_filtered[start:end]
+        total_items, items = self.repo.search(query, (pagination.page - 1) * size, size)
+        return search_page(query, total_items, items, pagination)
 
-        return {
-            "page": page,
-            "size": size,
-            "total_items": total_items,
-            "total_pages": total_pages,
-            "items": items_page
-        }
+    def get_stats(self) -> Dict[str, Any]:
+        return self.repo.stats()
 
     def get_todo(self, todo_id: UUID) -> Dict:
         return self.repo.get_by_id(todo_id)
 
     def create_todo(self, todo_data: Create) -> Dict:
-        created_todo = self.repo.create(todo_data)
-        self.event_producer.send_event("todo_created", created_todo)
-        return created_todo
+        with self.unit_of_work.begin():
+            return self.repo.create(todo_data)
 
     def update_todo(self, todo_id: UUID, update_data: Update) -> Dict:
-        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
-        if not update_dict:
-            raise ParameterError(detail="No fields provided for update")
-        updated_todo = self.repo.update(todo_id, update_dict)
-        self.event_producer.send_event("todo_updated", updated_todo)
-        return updated_todo
+        update_dict = update_fields(update_data)
+        with self.unit_of_work.begin():
+            return self.repo.update(todo_id, update_dict)
 
     def delete_todo(self, todo_id: UUID) -> None:
-        self.repo.delete(todo_id)
-        self.event_producer.send_event("todo_deleted", {"id": str(todo_id)})
\ No newline at end of file
+        with self.unit_of_work.begin():
+            self.repo.delete(todo_id)
\ No newline at end of file